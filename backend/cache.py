@@ -0,0 +1,202 @@
+"""In-process caches for the LoveActs API"""
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """LRU cache whose entries also expire `ttl` seconds after being stored.
+
+    Only touched from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class LocalResponseBackend:
+    """Response cache backend held in this process: an LRU of {variant: body} per key.
+
+    Each key keeps at most `max_variants` bodies, dropping the oldest first.
+    Invalidations only reach this worker; run a shared backend when the API
+    runs as several processes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_variants: int = 32):
+        self._cache = TTLCache(maxsize, ttl)
+        self.max_variants = max_variants
+
+    async def get(self, key: str, variant: str):
+        return self._cache.get(key, {}).get(variant)
+
+    async def set(self, key: str, variant: str, body: bytes):
+        variants = self._cache.get(key)
+        if variants is None:
+            variants = {}
+            self._cache.set(key, variants)
+        variants.pop(variant, None)
+        variants[variant] = body
+        while len(variants) > self.max_variants:
+            del variants[next(iter(variants))]
+
+    async def delete(self, *keys: str):
+        self._cache.invalidate(*keys)
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        return {"backend": "local", "size": stats["size"], "maxsize": stats["maxsize"],
+                "evictions": stats["evictions"]}
+
+
+class SharedResponseBackend:
+    """Response cache backend on a Redis-compatible store shared by every worker.
+
+    Each key is a hash of {variant: body} that expires `ttl` seconds after its
+    first write, so an invalidation drops all variants with one DEL. A key
+    already holding `max_variants` bodies takes no new ones until it expires
+    or is invalidated.
+    """
+
+    def __init__(self, store, ttl: float, max_variants: int = 32):
+        self.store = store
+        self.ttl = int(ttl)
+        self.max_variants = max_variants
+
+    @classmethod
+    def from_url(cls, url: str, ttl: float, max_variants: int = 32) -> "SharedResponseBackend":
+        if url.startswith("memory://"):
+            return cls(MemoryStore(), ttl, max_variants)
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_URL needs the optional `redis` package") from None
+        return cls(redis.Redis.from_url(url), ttl, max_variants)
+
+    async def get(self, key: str, variant: str):
+        return await self.store.hget(key, variant)
+
+    async def set(self, key: str, variant: str, body: bytes):
+        if await self.store.hlen(key) >= self.max_variants:
+            return
+        await self.store.hset(key, variant, body)
+        await self.store.expire(key, self.ttl, nx=True)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.store.delete(*keys)
+
+    def stats(self) -> dict:
+        return {"backend": type(self.store).__name__}
+
+
+class MemoryStore:
+    """In-process stand-in for the Redis commands the shared backend uses"""
+
+    def __init__(self):
+        self._data = {}
+
+    def _live(self, key: str):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    async def hget(self, key: str, field: str):
+        entry = self._live(key)
+        return entry[1].get(field) if entry else None
+
+    async def hlen(self, key: str) -> int:
+        entry = self._live(key)
+        return len(entry[1]) if entry else 0
+
+    async def hset(self, key: str, field: str, value: bytes):
+        entry = self._live(key)
+        if entry is None:
+            entry = self._data[key] = [None, {}]
+        entry[1][field] = value
+
+    async def expire(self, key: str, seconds: int, nx: bool = False):
+        entry = self._live(key)
+        if entry is not None and not (nx and entry[0] is not None):
+            entry[0] = time.monotonic() + seconds
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+
+class ResponseCache:
+    """Serialized GET responses keyed by route and owner, dropped by the writes that change them"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = {}
+        self.misses = {}
+
+    @staticmethod
+    def key(route: str, owner_id: str) -> str:
+        return f"response:{route}:{owner_id}"
+
+    async def get(self, route: str, owner_id: str, variant: str = ""):
+        body = await self.backend.get(self.key(route, owner_id), variant)
+        counts = self.misses if body is None else self.hits
+        counts[route] = counts.get(route, 0) + 1
+        return body
+
+    async def set(self, route: str, owner_id: str, body: bytes, variant: str = ""):
+        await self.backend.set(self.key(route, owner_id), variant, body)
+
+    async def invalidate(self, routes, *owner_ids: str):
+        await self.backend.delete(*(self.key(route, owner_id) for route in routes for owner_id in owner_ids))
+
+    def stats(self) -> dict:
+        routes = {}
+        for route in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits.get(route, 0), self.misses.get(route, 0)
+            routes[route] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 4)}
+        return {**self.backend.stats(), "routes": routes}
@@ -0,0 +1,101 @@
+"""In-process pub/sub hub pushing couple events to connected clients
+
+Every write publishes an event on its author's channel (the user id); a
+connection subscribes to the channels of both members of its couple, so the
+partner hears about it without polling. Each connection has a bounded queue:
+a client that cannot keep up loses its oldest events and is told to resync,
+so a slow reader never blocks a publisher or grows memory.
+
+The hub only reaches connections held by this process. With several
+workers, route a couple's connections to one worker or bridge the hub
+through a shared broker.
+"""
+import asyncio
+from typing import Dict, Iterable, Set
+
+import metrics
+
+realtime_connections = metrics.registry.register(metrics.Gauge(
+    "realtime_connections", "Open real-time event connections"
+))
+realtime_events_published = metrics.registry.register(metrics.Counter(
+    "realtime_events_published_total", "Events published to the hub by type", labels=("type",)
+))
+realtime_events_dropped = metrics.registry.register(metrics.Counter(
+    "realtime_events_dropped_total", "Events dropped from the queue of a connection that fell behind"
+))
+
+
+class HubFull(Exception):
+    """The hub already holds its maximum number of connections"""
+
+
+class Subscription:
+    def __init__(self, channels: Iterable[str], queue_size: int):
+        self.channels = tuple(channels)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def offer(self, event: dict):
+        """Enqueue without waiting; when full, drop the oldest event and flag a resync"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.lagged = True
+            realtime_events_dropped.inc()
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        if self.lagged:
+            # Events were lost: the client should refetch instead of trusting the stream
+            self.lagged = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return {"type": "resync"}
+        return await self.queue.get()
+
+
+class EventHub:
+    """Fans events out from publishers to the subscriptions on their channel.
+
+    Only touched from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, max_connections: int, queue_size: int):
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self.connections = 0
+
+    def subscribe(self, *channels: str) -> Subscription:
+        if self.connections >= self.max_connections:
+            raise HubFull()
+        subscription = Subscription(channels, self.queue_size)
+        for channel in subscription.channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        self.connections += 1
+        realtime_connections.set(self.connections)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[channel]
+        self.connections -= 1
+        realtime_connections.set(self.connections)
+
+    def publish(self, channel: str, event: dict):
+        realtime_events_published.inc(type=event["type"])
+        for subscription in self._channels.get(channel, ()):
+            subscription.offer(event)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "max_connections": self.max_connections,
+            "channels": len(self._channels),
+            "queue_size": self.queue_size,
+        }
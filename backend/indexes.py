@@ -0,0 +1,180 @@
+"""Declarative index catalogue for every LoveActs collection.
+
+ensure_indexes() compares the catalogue with what each collection already
+has, builds only the missing indexes (all collections concurrently) and
+reports indexes that failed to build, are redundant, unused or not in the
+catalogue. Indexes are never dropped automatically.
+"""
+import asyncio
+import logging
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Activities still waiting for a rating. Activities are stored with rating: null
+# until rated, and a partial index can only match that with $type.
+PENDING_RATING = {"rating": {"$type": "null"}}
+
+INDEX_CATALOGUE = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("partner_code", ASCENDING)]),
+    ],
+    "couples": [
+        IndexModel([("code", ASCENDING)], unique=True),
+    ],
+    "activities": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        # Feeds: equality on the owner, then the (timestamp, id) keyset sort
+        IndexModel([("giver_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("receiver_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel(
+            [("receiver_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="pending_by_receiver",
+            partialFilterExpression=PENDING_RATING
+        ),
+        # Offline sync: replayed activities are deduplicated on the client's key
+        IndexModel(
+            [("giver_id", ASCENDING), ("client_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"client_key": {"$exists": True}}
+        ),
+        # Delta sync: changes after an (updated_at, id) token, per owner
+        IndexModel([("giver_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("receiver_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)]),
+        # Special memories: only 5-star activities are indexed
+        IndexModel([("giver_id", ASCENDING)], name="five_star_by_giver", partialFilterExpression={"rating": 5}),
+        IndexModel([("receiver_id", ASCENDING)], name="five_star_by_receiver", partialFilterExpression={"rating": 5}),
+    ],
+    "moods": [
+        IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)]),
+    ],
+    "achievements": [
+        IndexModel([("user_id", ASCENDING), ("unlocked_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("achievement_type", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)]),
+    ],
+    "user_counters": [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+    "daily_memories": [
+        IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=2 * 86400),
+    ],
+}
+
+# Options that change what an index does; anything else (v, ns, ...) is ignored
+SPEC_OPTIONS = ("unique", "partialFilterExpression", "expireAfterSeconds", "sparse")
+
+
+def index_spec(document: dict) -> dict:
+    """Comparable form of an index from the catalogue or from list_indexes"""
+    spec = {"key": [(field, int(direction)) for field, direction in document["key"].items()]}
+    for option in SPEC_OPTIONS:
+        if document.get(option) not in (None, False):
+            spec[option] = document[option]
+    return spec
+
+
+def find_redundant(existing: dict) -> list:
+    """Plain indexes whose keys are a prefix of another index on the same collection"""
+    redundant = []
+    for name, spec in existing.items():
+        if name == "_id_" or len(spec) > 1:  # unique/partial/TTL indexes do more than serve reads
+            continue
+        for other_name, other in existing.items():
+            if other_name != name and "partialFilterExpression" not in other \
+                    and other["key"][:len(spec["key"])] == spec["key"] and len(other["key"]) > len(spec["key"]):
+                redundant.append({"index": name, "covered_by": other_name})
+                break
+    return redundant
+
+
+async def unused_indexes(collection) -> list:
+    """Indexes with no recorded use since the server last started"""
+    try:
+        stats = await collection.aggregate([{"$indexStats": {}}]).to_list(None)
+    except OperationFailure:
+        return []
+    return [row["name"] for row in stats if row["name"] != "_id_" and row["accesses"]["ops"] == 0]
+
+
+async def create_missing(collection, models: list):
+    """Build the missing indexes; returns (created names, failures) rather than raising.
+
+    A unique index fails to build over existing duplicates, e.g. moods or
+    achievements from before the mood_day_keys and dedupe_achievements
+    migrations. The other indexes are still built and the API still starts.
+    """
+    if not models:
+        return [], []
+    try:
+        await collection.create_indexes(models)
+        return [model.document["name"] for model in models], []
+    except OperationFailure:
+        pass
+    # One failure fails the whole command: retry one by one to keep the others
+    created, failed = [], []
+    for model in models:
+        try:
+            await collection.create_indexes([model])
+            created.append(model.document["name"])
+        except OperationFailure as e:
+            failed.append({"index": model.document["name"], "error": str(e.details.get("errmsg", e))})
+    return created, failed
+
+
+async def ensure_collection(db, name: str, models: list) -> dict:
+    collection = db[name]
+    existing = {
+        info["name"]: index_spec(info)
+        async for info in collection.list_indexes()
+    }
+    wanted = {model.document["name"]: model for model in models}
+
+    missing = [model for index_name, model in wanted.items() if index_name not in existing]
+    mismatched = [
+        index_name for index_name, model in wanted.items()
+        if index_name in existing and existing[index_name] != index_spec(model.document)
+    ]
+    created, failed = await create_missing(collection, missing)
+
+    unused = await unused_indexes(collection) if existing else []
+    return {
+        "created": created,
+        "failed": failed,
+        "mismatched": mismatched,
+        "unknown": sorted(index_name for index_name in existing if index_name not in wanted and index_name != "_id_"),
+        "redundant": find_redundant(existing),
+        "unused": unused,
+    }
+
+
+async def ensure_indexes(db, catalogue: dict = None) -> dict:
+    """Build missing catalogue indexes across collections concurrently and report drift"""
+    catalogue = catalogue or INDEX_CATALOGUE
+    results = await asyncio.gather(*(
+        ensure_collection(db, name, models) for name, models in catalogue.items()
+    ))
+    report = dict(zip(catalogue, results))
+
+    for name, result in report.items():
+        if result["created"]:
+            logger.info(f"{name}: built indexes {', '.join(result['created'])}")
+        for entry in result["failed"]:
+            logger.error(f"{name}: could not build index {entry['index']}: {entry['error']} "
+                         f"(run the data migrations, see migrations.py --list)")
+        if result["mismatched"]:
+            logger.warning(f"{name}: indexes differ from the catalogue: {', '.join(result['mismatched'])}")
+        if result["unknown"]:
+            logger.warning(f"{name}: indexes not in the catalogue: {', '.join(result['unknown'])}")
+        for entry in result["redundant"]:
+            logger.warning(f"{name}: index {entry['index']} is redundant with {entry['covered_by']}")
+        if result["unused"]:
+            logger.info(f"{name}: indexes unused since server start: {', '.join(result['unused'])}")
+    return report
@@ -0,0 +1,236 @@
+"""
+LoveActs V2.0 data migrations
+
+Usage (from the backend directory):
+    python migrations.py <migration> [<migration> ...]
+    python migrations.py --list
+"""
+import argparse
+import asyncio
+from datetime import date, timedelta
+
+from pymongo import UpdateOne
+
+from server import db, client, logger, partner_snapshot, PENDING_RATING
+
+BATCH_SIZE = 1000
+
+
+async def flush(collection, operations: list) -> int:
+    if not operations:
+        return 0
+    result = await collection.bulk_write(operations, ordered=False)
+    operations.clear()
+    return result.upserted_count + result.modified_count
+
+
+async def backfill_user_counters():
+    """Rebuild user_counters (and the unlocked set) from existing history; run after mood_day_keys"""
+    counters = {}
+
+    def entry(user_id: str) -> dict:
+        return counters.setdefault(user_id, {
+            "activities_given": 0,
+            "five_star_ratings": 0,
+            "mood_days": 0,
+            "partners_linked": 0,
+            "pending_count": 0,
+            "unlocked": [],
+        })
+
+    async for row in db.activities.aggregate([
+        {"$group": {
+            "_id": "$giver_id",
+            "given": {"$sum": 1},
+            "five_stars": {"$sum": {"$cond": [{"$eq": ["$rating", 5]}, 1, 0]}}
+        }}
+    ]):
+        entry(row["_id"]).update(activities_given=row["given"], five_star_ratings=row["five_stars"])
+
+    async for row in db.activities.aggregate([
+        {"$match": PENDING_RATING},
+        {"$group": {"_id": "$receiver_id", "pending": {"$sum": 1}}}
+    ]):
+        entry(row["_id"])["pending_count"] = row["pending"]
+
+    async for row in db.moods.aggregate([
+        {"$group": {
+            "_id": "$user_id",
+            "days": {"$sum": 1}
+        }}
+    ]):
+        entry(row["_id"])["mood_days"] = row["days"]
+
+    async for user in db.users.find({"partner_id": {"$ne": None}}, {"id": 1}):
+        entry(user["id"])["partners_linked"] = 1
+
+    async for row in db.achievements.aggregate([
+        {"$group": {"_id": "$user_id", "types": {"$addToSet": "$achievement_type"}}}
+    ]):
+        entry(row["_id"])["unlocked"] = row["types"]
+
+    operations = []
+    written = 0
+    for user_id, values in counters.items():
+        operations.append(UpdateOne({"user_id": user_id}, {"$set": values}, upsert=True))
+        if len(operations) >= BATCH_SIZE:
+            written += await flush(db.user_counters, operations)
+    written += await flush(db.user_counters, operations)
+    logger.info(f"user_counters: backfilled {written} of {len(counters)} users")
+
+
+async def dedupe_achievements():
+    """Drop duplicate (user_id, achievement_type) rows so the unique index can be built"""
+    removed = 0
+    async for row in db.achievements.aggregate([
+        {"$sort": {"unlocked_at": 1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "achievement_type": "$achievement_type"},
+            "ids": {"$push": "$_id"}
+        }},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True):
+        result = await db.achievements.delete_many({"_id": {"$in": row["ids"][1:]}})
+        removed += result.deleted_count
+    logger.info(f"achievements: removed {removed} duplicates")
+
+
+async def backfill_mood_day_keys():
+    """Add the per-user local day key to moods and keep one mood per (user_id, day)"""
+    # Users with an explicit timezone first; everyone else is on UTC
+    timezones = await db.users.distinct("timezone", {"timezone": {"$nin": [None, "UTC"]}})
+    updated = 0
+    for timezone in timezones:
+        user_ids = await db.users.distinct("id", {"timezone": timezone})
+        result = await db.moods.update_many(
+            {"day": {"$exists": False}, "user_id": {"$in": user_ids}},
+            [{"$set": {"day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date", "timezone": timezone}}}}]
+        )
+        updated += result.modified_count
+
+    result = await db.moods.update_many(
+        {"day": {"$exists": False}},
+        [{"$set": {"day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}}}]
+    )
+    updated += result.modified_count
+
+    # Keep the latest mood of each day, as create_mood used to overwrite it
+    removed = 0
+    async for row in db.moods.aggregate([
+        {"$sort": {"date": -1}},
+        {"$group": {"_id": {"user_id": "$user_id", "day": "$day"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True):
+        result = await db.moods.delete_many({"_id": {"$in": row["ids"][1:]}})
+        removed += result.deleted_count
+    logger.info(f"moods: added day keys to {updated} moods, removed {removed} same-day duplicates")
+
+
+async def backfill_updated_at():
+    """Stamp updated_at on activities, moods and achievements written before delta sync"""
+    sources = {
+        "activities": {"$ifNull": ["$rated_at", "$created_at"]},
+        "moods": "$date",
+        "achievements": "$unlocked_at",
+    }
+    for name, source in sources.items():
+        result = await db[name].update_many(
+            {"updated_at": {"$exists": False}},
+            [{"$set": {"updated_at": source}}]
+        )
+        logger.info(f"{name}: stamped updated_at on {result.modified_count} documents")
+
+
+def streak_fields(days: list) -> dict:
+    """Streak counters for a user's sorted, distinct active days (YYYY-MM-DD)"""
+    current = longest = 0
+    previous = None
+    for day in map(date.fromisoformat, days):
+        current = current + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return {"last_active_day": days[-1] if days else None, "current_streak": current, "longest_streak": longest}
+
+
+async def backfill_streaks():
+    """Rebuild current/longest streaks from activities given and moods logged; run after user_counters"""
+    written = 0
+    timezones = await db.users.distinct("timezone")
+    for timezone in set(timezones) | {None}:
+        user_ids = await db.users.distinct("id", {"timezone": timezone})
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            batch = user_ids[start:start + BATCH_SIZE]
+            day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$at", "timezone": timezone or "UTC"}}
+            operations = []
+            async for row in db.activities.aggregate([
+                {"$match": {"giver_id": {"$in": batch}}},
+                {"$project": {"_id": 0, "user_id": "$giver_id", "at": "$created_at"}},
+                {"$unionWith": {"coll": "moods", "pipeline": [
+                    {"$match": {"user_id": {"$in": batch}}},
+                    {"$project": {"_id": 0, "user_id": 1, "at": "$date"}}
+                ]}},
+                {"$group": {"_id": "$user_id", "days": {"$addToSet": day}}}
+            ], allowDiskUse=True):
+                operations.append(UpdateOne(
+                    {"user_id": row["_id"]}, {"$set": streak_fields(sorted(row["days"]))}, upsert=True
+                ))
+            written += await flush(db.user_counters, operations)
+    logger.info(f"user_counters: backfilled streaks for {written} users")
+
+
+async def backfill_partner_snapshots():
+    """Store each linked user's partner name, timezone and latest mood on their user document"""
+    operations = []
+    written = 0
+    async for row in db.users.aggregate([
+        {"$match": {"partner_id": {"$ne": None}}},
+        {"$project": {"_id": 0, "id": 1, "partner_id": 1}},
+        {"$lookup": {"from": "users", "localField": "partner_id", "foreignField": "id", "as": "partner",
+                     "pipeline": [{"$project": {"_id": 0, "name": 1, "timezone": 1}}]}},
+        {"$lookup": {"from": "moods", "localField": "partner_id", "foreignField": "user_id", "as": "mood",
+                     "pipeline": [{"$sort": {"date": -1}}, {"$limit": 1}]}},
+        {"$match": {"partner.0": {"$exists": True}}}
+    ], allowDiskUse=True):
+        partner = row["partner"][0]
+        snapshot = partner_snapshot(
+            row["partner_id"], partner["name"], partner.get("timezone"), (row["mood"] or [None])[0]
+        )
+        operations.append(UpdateOne({"id": row["id"]}, {"$set": {"partner": snapshot.dict()}}))
+        if len(operations) >= BATCH_SIZE:
+            written += await flush(db.users, operations)
+    written += await flush(db.users, operations)
+    logger.info(f"users: wrote {written} partner snapshots")
+
+
+MIGRATIONS = {
+    "dedupe_achievements": dedupe_achievements,
+    "mood_day_keys": backfill_mood_day_keys,
+    "user_counters": backfill_user_counters,
+    "updated_at": backfill_updated_at,
+    "streaks": backfill_streaks,
+    "partner_snapshots": backfill_partner_snapshots,
+}
+
+
+async def main(names):
+    try:
+        for name in names:
+            logger.info(f"Running migration {name}")
+            await MIGRATIONS[name]()
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("migrations", nargs="*", help="migrations to run, in order")
+    parser.add_argument("--list", action="store_true", help="list available migrations")
+    args = parser.parse_args()
+    unknown = [name for name in args.migrations if name not in MIGRATIONS]
+    if unknown:
+        parser.error(f"unknown migrations: {', '.join(unknown)}")
+    if args.list or not args.migrations:
+        for name, func in MIGRATIONS.items():
+            print(f"{name:<24} {func.__doc__}")
+    else:
+        asyncio.run(main(args.migrations))
@@ -0,0 +1,178 @@
+"""Response format and compression negotiation for the LoveActs API
+
+MessagePack is served to clients that ask for it in `Accept`; everyone else
+gets JSON. Complete (non-streamed) bodies above a size threshold are
+compressed with brotli or gzip, whichever the client prefers and this
+install supports. msgpack and brotli are optional at import time: without
+them the API falls back to JSON and gzip.
+"""
+import asyncio
+import contextvars
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+import metrics
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the install
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the install
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack", "text/")
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Body format negotiated for the request being served
+response_format = contextvars.ContextVar("response_format", default=JSON)
+
+response_body_bytes = metrics.registry.register(metrics.Counter(
+    "http_response_body_bytes_total", "Response body bytes before and after compression",
+    labels=("format", "encoding", "stage")
+))
+
+
+def accepted(header: str) -> dict:
+    """{token: q} for an Accept or Accept-Encoding header, dropping q=0 entries"""
+    tokens = {}
+    for part in header.split(","):
+        token, *params = [piece.strip() for piece in part.split(";")]
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            tokens[token.lower()] = quality
+    return tokens
+
+
+def negotiate_format(accept: str) -> str:
+    """MessagePack when the client accepts it at least as much as JSON"""
+    if msgpack is None:
+        return JSON
+    tokens = accepted(accept)
+    msgpack_q = max((q for token, q in tokens.items() if token in MSGPACK_TYPES), default=0)
+    json_q = max(tokens.get(JSON, 0), tokens.get("*/*", 0) if JSON not in tokens else 0)
+    return MSGPACK if msgpack_q and msgpack_q >= json_q else JSON
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    tokens = accepted(accept_encoding)
+    candidates = [encoding for encoding in ("br", "gzip") if encoding in tokens]
+    if brotli is None and "br" in candidates:
+        candidates.remove("br")
+    if not candidates:
+        return None
+    return max(candidates, key=lambda encoding: tokens[encoding])
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def add_vary(headers: MutableHeaders):
+    headers.add_vary_header("Accept")
+    headers.add_vary_header("Accept-Encoding")
+
+
+class NegotiationMiddleware:
+    """ASGI middleware choosing the body format and compressing complete responses.
+
+    The format is published through `response_format` for the response class
+    to render with. Bodies of at least `minimum_size` bytes are compressed;
+    from `offload_size` bytes on, compression runs on the default executor so
+    large payloads do not block the event loop. Streamed responses are not
+    compressed. Every response varies on both negotiated headers, so caches
+    never hand one client's format or encoding to another.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, offload_size: int = 64 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        body_format = negotiate_format(headers.get("accept", ""))
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        token = response_format.set(body_format)
+        try:
+            if encoding is None:
+                await self.app(scope, receive, self.varying_send(send))
+            else:
+                await self.app(scope, receive, self.compressing_send(send, body_format, encoding))
+        finally:
+            response_format.reset(token)
+
+    def varying_send(self, send):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                add_vary(MutableHeaders(raw=message["headers"]))
+            await send(message)
+
+        return send_wrapper
+
+    def compressing_send(self, send, body_format: str, encoding: str):
+        state = {"start": None, "streaming": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body" or state["streaming"]:
+                await send(message)
+                return
+
+            start, body = state["start"], message.get("body", b"")
+            if message.get("more_body", False):
+                # A stream: its size is unknown, send it as it comes
+                state["streaming"] = True
+                add_vary(MutableHeaders(raw=start["headers"]))
+                await send(start)
+                await send(message)
+                return
+
+            response_headers = MutableHeaders(raw=start["headers"])
+            eligible = (
+                len(body) >= self.minimum_size
+                and start["status"] not in (204, 206, 304)
+                and "content-encoding" not in response_headers
+                and response_headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            )
+            if eligible:
+                if len(body) >= self.offload_size:
+                    compressed = await asyncio.get_running_loop().run_in_executor(None, compress, body, encoding)
+                else:
+                    compressed = compress(body, encoding)
+                response_body_bytes.inc(len(body), format=body_format, encoding=encoding, stage="raw")
+                response_body_bytes.inc(len(compressed), format=body_format, encoding=encoding, stage="sent")
+                body = compressed
+                response_headers["Content-Encoding"] = encoding
+                response_headers["Content-Length"] = str(len(body))
+            add_vary(response_headers)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        return send_wrapper
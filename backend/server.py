@@ -1,52 +1,183 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, WebSocket, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel, ASCENDING
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional
 import uuid
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
 import jwt
 from enum import Enum
 import random
 import string
+import base64
+import json
+import orjson
+import hmac
+
+from cache import TTLCache, LocalResponseBackend, ResponseCache, SharedResponseBackend
+from events import EventHub, HubFull
+import metrics
+from negotiation import msgpack, response_format, NegotiationMiddleware, MSGPACK
+from slow_queries import SlowQueryDetector, SlowQueryListener
+from indexes import ensure_indexes, PENDING_RATING
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+slow_query_detector = SlowQueryDetector(
+    mongo_url,
+    threshold_ms=float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100')),
+    max_shapes=int(os.environ.get('SLOW_QUERY_MAX_SHAPES', '500'))
+)
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[
+        metrics.CommandMetricsListener(),
+        metrics.PoolMetricsListener(),
+        SlowQueryListener(slow_query_detector)
+    ]
+)
 db = client[os.environ['DB_NAME']]
 
 # Create indexes
+index_report = {}
+
 async def setup_indexes():
-    await db.users.create_index([("email", ASCENDING)], unique=True)
-    await db.couples.create_index([("code", ASCENDING)], unique=True)
-    await db.activities.create_index([("giver_id", ASCENDING)])
-    await db.activities.create_index([("receiver_id", ASCENDING)])
-    await db.moods.create_index([("user_id", ASCENDING), ("date", ASCENDING)])
+    """Build any index from the catalogue that is missing and report index drift"""
+    index_report.update(await ensure_indexes(db))
+    return index_report
+
+# Multi-document transactions need a replica set or a sharded cluster; on a
+# standalone server the same guarded writes run without one. Set at startup.
+deployment = {"transactions": False}
+
+async def detect_deployment():
+    hello = await client.admin.command("hello")
+    deployment["transactions"] = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return deployment
 
 # JWT Configuration
 SECRET_KEY = os.environ.get('JWT_SECRET', 'your-secret-key-here')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
+# Password hashing: bcrypt runs on a bounded thread pool (it releases the GIL),
+# never on the event loop. Requests beyond the queue limit are shed with a 503.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '64'))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+password_pool_stats = {"in_flight": 0, "completed": 0, "rejected": 0}
+
+# Principal cache: authenticated users by id, so most requests skip the users lookup.
+# Writes that change a user document must invalidate its entry.
+principal_cache = TTLCache(
+    maxsize=int(os.environ.get('PRINCIPAL_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('PRINCIPAL_CACHE_TTL', '60'))
+)
+
+# Response cache: serialized GET bodies per owner and route, dropped by the
+# writes that change them. RESPONSE_CACHE_URL selects a backend shared by all
+# workers (redis://..., or memory:// for the in-process stand-in); unset keeps
+# an LRU in each process.
+RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', '')
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '300'))
+# Bodies kept per route and owner (page sizes x fieldsets x formats)
+RESPONSE_CACHE_MAX_VARIANTS = int(os.environ.get('RESPONSE_CACHE_MAX_VARIANTS', '32'))
+CACHED_ROUTES = ("dashboard", "achievements", "moods")
+response_cache = ResponseCache(
+    SharedResponseBackend.from_url(RESPONSE_CACHE_URL, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_VARIANTS)
+    if RESPONSE_CACHE_URL
+    else LocalResponseBackend(
+        int(os.environ.get('RESPONSE_CACHE_SIZE', '10000')), RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_VARIANTS
+    )
+)
+
+# Real-time events: per-connection queues are bounded, so a slow client is told
+# to resync instead of holding memory or blocking publishers
+REALTIME_MAX_CONNECTIONS = int(os.environ.get('REALTIME_MAX_CONNECTIONS', '10000'))
+REALTIME_QUEUE_SIZE = int(os.environ.get('REALTIME_QUEUE_SIZE', '64'))
+REALTIME_KEEPALIVE = float(os.environ.get('REALTIME_KEEPALIVE', '25'))
+event_hub = EventHub(REALTIME_MAX_CONNECTIONS, REALTIME_QUEUE_SIZE)
+
+# Special memories
+SPECIAL_MEMORIES_COUNT = 10
+daily_memories_cache = TTLCache(maxsize=10000, ttl=3600)
+
+# Offline sync
+SYNC_BATCH_MAX_ITEMS = 200
+SYNC_MAX_DOCS = 500  # per collection and response
+# Writes stamped just before a sync may not be visible yet, so the next token
+# overlaps by this much. Clients deduplicate by id.
+SYNC_TOKEN_OVERLAP = timedelta(seconds=5)
+
+# Pagination
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
 # Security
 security = HTTPBearer()
 
+# Operational endpoints (/api/internal/*, /metrics) need this bearer token;
+# without it configured they are not served at all
+INTERNAL_API_TOKEN = os.environ.get('INTERNAL_API_TOKEN', '')
+internal_security = HTTPBearer(auto_error=False)
+
+def json_default(value):
+    """orjson fallback for the only non-native values handlers return: Pydantic models"""
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def msgpack_default(value):
+    """MessagePack has no datetime type; send the same ISO strings as JSON"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return json_default(value)
+
+def dump_json(content) -> bytes:
+    return orjson.dumps(content, default=json_default)
+
+def dump_body(content) -> bytes:
+    """Render in the format negotiated for the current request"""
+    if response_format.get() == MSGPACK:
+        return msgpack.packb(content, default=msgpack_default)
+    return dump_json(content)
+
+class NegotiatedResponse(ORJSONResponse):
+    """Mongo documents rendered straight to JSON (orjson) or MessagePack, without jsonable_encoder"""
+    def render(self, content) -> bytes:
+        self.media_type = response_format.get()
+        return dump_body(content)
+
 # Create the main app without a prefix
-app = FastAPI(title="LoveActs V2.0 API")
+app = FastAPI(title="LoveActs V2.0 API", default_response_class=NegotiatedResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+async def require_internal_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(internal_security)):
+    """Hide operational endpoints unless the internal token is configured and presented"""
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(credentials.credentials, INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid internal token")
+
+internal_router = APIRouter(prefix="/internal", dependencies=[Depends(require_internal_token)])
+
 # Enums
 class ActivityCategory(str, Enum):
     FISICO = "físico"
@@ -74,11 +205,21 @@ class UserCreate(BaseModel):
     name: str
     email: EmailStr
     password: str
+    timezone: str = "UTC"
 
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class PartnerSnapshot(BaseModel):
+    """The partner's name, timezone and latest mood, kept on each user document by the writes"""
+    id: str
+    name: str
+    timezone: str = "UTC"
+    latest_mood: Optional[str] = None
+    mood_note: Optional[str] = None
+    mood_date: Optional[datetime] = None
+
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -86,6 +227,8 @@ class User(BaseModel):
     password_hash: str
     partner_code: Optional[str] = None
     partner_id: Optional[str] = None
+    partner: Optional[PartnerSnapshot] = None
+    timezone: str = "UTC"
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class UserResponse(BaseModel):
@@ -128,6 +271,7 @@ class Activity(BaseModel):
     comment: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     rated_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class ActivityRating(BaseModel):
     rating: int = Field(ge=1, le=5)
@@ -143,6 +287,8 @@ class Mood(BaseModel):
     mood_emoji: MoodEmoji
     note: Optional[str] = None
     date: datetime = Field(default_factory=datetime.utcnow)
+    day: str  # YYYY-MM-DD in the user's timezone, unique per user
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Achievement(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -151,6 +297,7 @@ class Achievement(BaseModel):
     title: str
     description: str
     unlocked_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class DashboardStats(BaseModel):
     total_activities_given: int
@@ -161,6 +308,85 @@ class DashboardStats(BaseModel):
     achievements_count: int
     pending_ratings: int
 
+class QueuedActivity(BaseModel):
+    client_key: str = Field(min_length=1, max_length=64)
+    title: str
+    description: str
+    category: ActivityCategory
+    receiver_id: Optional[str] = None  # defaults to the partner
+    created_at: Optional[datetime] = None  # when it was logged on the device
+
+class QueuedRating(BaseModel):
+    client_key: str = Field(min_length=1, max_length=64)
+    activity_id: str
+    rating: int = Field(ge=1, le=5)
+    comment: Optional[str] = None
+
+class QueuedMood(BaseModel):
+    client_key: str = Field(min_length=1, max_length=64)
+    mood_emoji: MoodEmoji
+    note: Optional[str] = None
+    recorded_at: Optional[datetime] = None  # when it was logged on the device
+
+class SyncBatch(BaseModel):
+    activities: List[QueuedActivity] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_ITEMS)
+    ratings: List[QueuedRating] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_ITEMS)
+    moods: List[QueuedMood] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_ITEMS)
+
+class AchievementRule(BaseModel):
+    achievement_type: AchievementType
+    counter: str
+    threshold: int
+    title: str
+    description: str
+
+# Achievements are unlocked when a per-user counter (see bump_counters) reaches
+# its threshold. New achievements are added here, not as new query code.
+ACHIEVEMENT_RULES = [
+    AchievementRule(
+        achievement_type=AchievementType.FIRST_ACTIVITY,
+        counter="activities_given",
+        threshold=1,
+        title="¡Primera Actividad!",
+        description="Registraste tu primera actividad de amor"
+    ),
+    AchievementRule(
+        achievement_type=AchievementType.TEN_ACTIVITIES,
+        counter="activities_given",
+        threshold=10,
+        title="¡Amante Dedicado!",
+        description="Has registrado 10 actividades de amor"
+    ),
+    AchievementRule(
+        achievement_type=AchievementType.FIRST_FIVE_STARS,
+        counter="five_star_ratings",
+        threshold=1,
+        title="⭐ Primera Estrella Dorada",
+        description="Recibiste tu primera calificación de 5 estrellas"
+    ),
+    AchievementRule(
+        achievement_type=AchievementType.FIVE_FIVE_STARS,
+        counter="five_star_ratings",
+        threshold=5,
+        title="⭐ Maestro del Amor",
+        description="Has obtenido 5 calificaciones de 5 estrellas"
+    ),
+    AchievementRule(
+        achievement_type=AchievementType.DAILY_MOOD_WEEK,
+        counter="mood_days",
+        threshold=7,
+        title="🌈 Semana de Emociones",
+        description="Registraste tu estado de ánimo durante 7 días"
+    ),
+    AchievementRule(
+        achievement_type=AchievementType.PARTNER_LINKED,
+        counter="partners_linked",
+        threshold=1,
+        title="💕 Corazones Unidos",
+        description="Te vinculaste con tu pareja"
+    ),
+]
+
 # Helper functions
 def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
@@ -169,6 +395,35 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def run_password_task(func, *args):
+    """Run bcrypt work on the password pool, shedding load when the queue is full"""
+    queued = password_pool_stats["in_flight"] - PASSWORD_HASH_WORKERS
+    if queued >= PASSWORD_HASH_MAX_QUEUE:
+        password_pool_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    
+    password_pool_stats["in_flight"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+    finally:
+        password_pool_stats["in_flight"] -= 1
+        password_pool_stats["completed"] += 1
+
+def get_password_pool_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_queue": PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": password_pool_stats["in_flight"],
+        "queue_depth": max(0, password_pool_stats["in_flight"] - PASSWORD_HASH_WORKERS),
+        "completed": password_pool_stats["completed"],
+        "rejected": password_pool_stats["rejected"],
+    }
+
+def local_day(timezone: str, moment: Optional[datetime] = None) -> str:
+    """Calendar day (YYYY-MM-DD) of a naive UTC datetime in the given timezone"""
+    moment = moment or datetime.utcnow()
+    return moment.replace(tzinfo=ZoneInfo("UTC")).astimezone(ZoneInfo(timezone)).date().isoformat()
+
 def generate_partner_code() -> str:
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
 
@@ -179,89 +434,275 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def serialize_doc(doc):
-    """Convert MongoDB document to JSON-serializable format"""
-    if doc is None:
-        return None
-    if isinstance(doc, list):
-        return [serialize_doc(item) for item in doc]
-    if isinstance(doc, dict):
-        result = {}
-        for key, value in doc.items():
-            if key == "_id":
-                continue  # Skip MongoDB _id field
-            result[key] = serialize_doc(value)
-        return result
-    return doc
+def field_projection(fields: Optional[str], model, sort_field: str) -> dict:
+    """Mongo projection for a `?fields=a,b` sparse fieldset of `model`; never returns _id.
+
+    The sort field and id are always included, as the keyset cursor is built from them.
+    """
+    if not fields:
+        return {"_id": 0}
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.__fields__)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {"_id": 0, "id": 1, sort_field: 1, **{name: 1 for name in requested}}
+
+def encode_cursor(timestamp: datetime, doc_id: str) -> str:
+    """Build an opaque keyset cursor from the last document of a page"""
+    raw = json.dumps([timestamp.isoformat(), doc_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, doc_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), str(doc_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def stream_ndjson(find_cursor, sort_field: str, page_size: Optional[int]):
+    """Yield documents straight from the Motor cursor, one JSON object per line"""
+    last = None
+    count = 0
+    try:
+        async for doc in find_cursor:
+            if page_size is not None and count == page_size:
+                # One extra document was fetched, so there is a next page
+                yield dump_json({"next_cursor": encode_cursor(last[sort_field], last["id"])}) + b"\n"
+                break
+            yield dump_json(doc) + b"\n"
+            last = doc
+            count += 1
+    finally:
+        await find_cursor.close()
+
+async def paginate(collection, query: dict, sort_field: str, limit: Optional[int], cursor: Optional[str],
+                   stream: bool = False, legacy_limit: Optional[int] = None, projection: Optional[dict] = None):
+    """Serve a newest-first feed, keyset-paginated on (sort_field, id).
+
+    Without `limit` or `cursor` the legacy bare list is returned, so existing
+    clients keep working. With either, the response is
+    {"items": [...], "next_cursor": ...}. `stream` switches to NDJSON, with a
+    trailing {"next_cursor": ...} line when another page exists. Documents are
+    returned as Motor decodes them, shaped only by `projection`.
+    """
+    paginated = limit is not None or cursor is not None
+    page_size = (limit or DEFAULT_PAGE_SIZE) if paginated else None
+
+    if cursor:
+        timestamp, doc_id = decode_cursor(cursor)
+        query = {"$and": [query, {"$or": [
+            {sort_field: {"$lt": timestamp}},
+            {sort_field: timestamp, "id": {"$lt": doc_id}}
+        ]}]}
+
+    find_cursor = collection.find(query, projection or {"_id": 0}).sort([(sort_field, -1), ("id", -1)])
+    if paginated:
+        find_cursor = find_cursor.limit(page_size + 1)
+    elif legacy_limit:
+        find_cursor = find_cursor.limit(legacy_limit)
+
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(find_cursor, sort_field, page_size),
+            media_type="application/x-ndjson"
+        )
+
+    docs = await find_cursor.to_list(None)
+    if not paginated:
+        return docs
+
+    next_cursor = None
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        next_cursor = encode_cursor(docs[-1][sort_field], docs[-1]["id"])
+    return {"items": docs, "next_cursor": next_cursor}
+
+async def cached_json(route: str, owner_id: str, etag: str, variant: str, compute) -> Response:
+    """Serve the cached JSON body of a route, computing and storing it on a miss.
+
+    Bodies are keyed by the ETag conditional_get answers with, which carries
+    the couple's data versions read before computing. A body computed before
+    a write and stored after its invalidation is never served once the write
+    has bumped the version, and a body is always sent under its own ETag.
+    """
+    body_format = response_format.get()
+    variant = f"{variant}|{etag}|{body_format}"
+    body = await response_cache.get(route, owner_id, variant)
+    if body is None:
+        body = dump_body(await compute())
+        await response_cache.set(route, owner_id, body, variant)
+    return Response(content=body, media_type=body_format)
+
+async def cached_feed(route: str, owner_id: str, etag: str, collection, query: dict, sort_field: str,
+                      limit: Optional[int], cursor: Optional[str], stream: bool, legacy_limit: Optional[int] = None,
+                      projection: Optional[dict] = None):
+    """paginate() with the first page cached per limit and fieldset; later pages and streams go to Mongo"""
+    if cursor or stream:
+        return await paginate(collection, query, sort_field, limit, cursor, stream, legacy_limit, projection)
+    # Keyed by the validated projection, so spelling or order of ?fields= does not add variants
+    fieldset = ",".join(sorted(name for name in (projection or {}) if name != "_id"))
+    return await cached_json(route, owner_id, etag, f"{limit or ''}|{fieldset}", lambda: paginate(
+        collection, query, sort_field, limit, cursor, stream, legacy_limit, projection
+    ))
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await authenticate(credentials.credentials)
+
+async def authenticate(token: str) -> User:
+    """The user a bearer token belongs to, from the principal cache when possible"""
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
     
+    cached = principal_cache.get(user_id)
+    if cached is not None:
+        return cached
+    
     user = await db.users.find_one({"id": user_id})
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(**user)
+    user = User(**user)
+    principal_cache.set(user_id, user)
+    return user
 
-async def check_achievements(user_id: str):
-    """Check and unlock new achievements for user"""
+def publish_event(user_id: str, event_type: str, **payload):
+    """Push an event to the connections of the user's couple"""
+    event_hub.publish(user_id, {"type": event_type, "user_id": user_id, **payload})
+
+def due_achievements(counters: dict) -> List[Achievement]:
+    """Achievements whose rule the counters satisfy and that are not unlocked yet"""
+    unlocked = set(counters.get("unlocked", []))
+    return [
+        Achievement(
+            user_id=counters["user_id"],
+            achievement_type=rule.achievement_type,
+            title=rule.title,
+            description=rule.description
+        )
+        for rule in ACHIEVEMENT_RULES
+        if rule.achievement_type.value not in unlocked and counters.get(rule.counter, 0) >= rule.threshold
+    ]
+
+async def unlock_achievements(counters: dict) -> List[Achievement]:
+    """Unlock every rule the counters now satisfy and that is not unlocked yet"""
+    user_id = counters["user_id"]
+    new_achievements = due_achievements(counters)
+    if not new_achievements:
+        return []
+    earned_types = [ach.achievement_type.value for ach in new_achievements]
     
-    # Get user's current achievements
-    current_achievements = await db.achievements.find({"user_id": user_id}).to_list(None)
-    current_types = {ach["achievement_type"] for ach in current_achievements}
-    
-    # Check first activity
-    if AchievementType.FIRST_ACTIVITY not in current_types:
-        activity_count = await db.activities.count_documents({"giver_id": user_id})
-        if activity_count >= 1:
-            achievement = Achievement(
-                user_id=user_id,
-                achievement_type=AchievementType.FIRST_ACTIVITY,
-                title="¡Primera Actividad!",
-                description="Registraste tu primera actividad de amor"
-            )
-            await db.achievements.insert_one(achievement.dict())
-    
-    # Check ten activities
-    if AchievementType.TEN_ACTIVITIES not in current_types:
-        activity_count = await db.activities.count_documents({"giver_id": user_id})
-        if activity_count >= 10:
-            achievement = Achievement(
-                user_id=user_id,
-                achievement_type=AchievementType.TEN_ACTIVITIES,
-                title="¡Amante Dedicado!",
-                description="Has registrado 10 actividades de amor"
-            )
-            await db.achievements.insert_one(achievement.dict())
-    
-    # Check first five stars
-    if AchievementType.FIRST_FIVE_STARS not in current_types:
-        five_star_count = await db.activities.count_documents({"giver_id": user_id, "rating": 5})
-        if five_star_count >= 1:
-            achievement = Achievement(
-                user_id=user_id,
-                achievement_type=AchievementType.FIRST_FIVE_STARS,
-                title="⭐ Primera Estrella Dorada",
-                description="Recibiste tu primera calificación de 5 estrellas"
-            )
-            await db.achievements.insert_one(achievement.dict())
-    
-    # Check five five-stars
-    if AchievementType.FIVE_FIVE_STARS not in current_types:
-        five_star_count = await db.activities.count_documents({"giver_id": user_id, "rating": 5})
-        if five_star_count >= 5:
-            achievement = Achievement(
-                user_id=user_id,
-                achievement_type=AchievementType.FIVE_FIVE_STARS,
-                title="⭐ Maestro del Amor",
-                description="Has obtenido 5 calificaciones de 5 estrellas"
-            )
-            await db.achievements.insert_one(achievement.dict())
+    # The unique (user_id, achievement_type) index makes concurrent unlocks of
+    # the same achievement safe: only one insert wins, duplicates are dropped.
+    try:
+        await db.achievements.insert_many([ach.dict() for ach in new_achievements], ordered=False)
+    except BulkWriteError as e:
+        duplicates = {err["index"] for err in e.details["writeErrors"] if err["code"] == 11000}
+        if len(duplicates) != len(e.details["writeErrors"]):
+            raise
+        new_achievements = [ach for i, ach in enumerate(new_achievements) if i not in duplicates]
+    
+    await db.user_counters.update_one(
+        {"user_id": user_id},
+        {"$addToSet": {"unlocked": {"$each": earned_types}}, "$inc": {"data_version": 1}}
+    )
+    for achievement in new_achievements:
+        publish_event(user_id, "achievement.unlocked", achievement=achievement.dict())
+    return new_achievements
+
+def streak_stages(day: str) -> list:
+    """Update pipeline stages recording activity on `day` (YYYY-MM-DD) in the streak fields"""
+    previous_day = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+    return [
+        {"$set": {"current_streak": {"$switch": {
+            "branches": [
+                # Already active that day, or a late (offline) write for an older day
+                {"case": {"$gte": ["$last_active_day", day]}, "then": "$current_streak"},
+                {"case": {"$eq": ["$last_active_day", previous_day]},
+                 "then": {"$add": [{"$ifNull": ["$current_streak", 0]}, 1]}},
+            ],
+            "default": 1
+        }}}},
+        {"$set": {
+            "longest_streak": {"$max": [{"$ifNull": ["$longest_streak", 0]}, "$current_streak"]},
+            "last_active_day": {"$max": [{"$ifNull": ["$last_active_day", ""]}, day]}
+        }}
+    ]
+
+async def bump_counters(user_id: str, active_days: Optional[List[str]] = None, **increments) -> List[Achievement]:
+    """Atomically $inc a user's counters and unlock the achievements they reach.
+
+    `active_days` (local YYYY-MM-DD) also advance the streak in the same write.
+    """
+    increments = {**increments, "data_version": 1}
+    if active_days:
+        update = []
+        if increments:
+            update.append({"$set": {
+                counter: {"$add": [{"$ifNull": [f"${counter}", 0]}, value]}
+                for counter, value in increments.items()
+            }})
+        for day in sorted(set(active_days)):
+            update.extend(streak_stages(day))
+    else:
+        update = {"$inc": increments}
+    
+    counters = await db.user_counters.find_one_and_update(
+        {"user_id": user_id},
+        update,
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return await unlock_achievements(counters)
+
+async def adjust_pending(user_id: str, delta: int):
+    """Keep the receiver's denormalized pending-ratings badge in step with its inbox"""
+    await db.user_counters.update_one(
+        {"user_id": user_id}, {"$inc": {"pending_count": delta, "data_version": 1}}, upsert=True
+    )
+
+async def bump_data_version(user_id: str):
+    """Mark the user's data as changed for writes that touch no other counter"""
+    await db.user_counters.update_one({"user_id": user_id}, {"$inc": {"data_version": 1}}, upsert=True)
+
+async def data_etag(user: User, *extra) -> str:
+    """Weak ETag over the user's and partner's data versions: one small counters read"""
+    user_ids = [user.id] + ([user.partner_id] if user.partner_id else [])
+    rows = await db.user_counters.find(
+        {"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1, "data_version": 1}
+    ).to_list(len(user_ids))
+    versions = {row["user_id"]: row.get("data_version", 0) for row in rows}
+    parts = [user.id[:8]] + [str(versions.get(user_id, 0)) for user_id in user_ids] + [str(part) for part in extra]
+    return 'W/"' + ".".join(parts) + '"'
+
+async def conditional_get(request: Request, user: User, respond, *extra) -> Response:
+    """Answer 304 when the client already holds the current data, else respond(etag) with the ETag.
+
+    Every write bumps the data version of the users whose responses it
+    changes, after the write itself. `extra` adds inputs that change without
+    a write, such as the local day for day-relative views. respond() gets the
+    ETag so cached bodies can be keyed by it.
+    """
+    # JSON and MessagePack are different representations of the same data
+    etag = await data_etag(user, *extra, *(["msgpack"] if response_format.get() == MSGPACK else []))
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+    response = await respond(etag)
+    if not isinstance(response, Response):
+        response = NegotiatedResponse(response)
+    response.headers["ETag"] = etag
+    return response
+
+async def check_achievements(user_id: str) -> List[Achievement]:
+    """Check and unlock new achievements for user"""
+    counters = await db.user_counters.find_one({"user_id": user_id})
+    if counters is None:
+        return []
+    return await unlock_achievements(counters)
 
 # Auth endpoints
 @api_router.post("/auth/register", response_model=TokenResponse)
@@ -271,15 +712,21 @@ async def register(user_data: UserCreate):
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
+    try:
+        ZoneInfo(user_data.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid timezone")
+    
     # Create user
-    password_hash = hash_password(user_data.password)
+    password_hash = await run_password_task(hash_password, user_data.password)
     partner_code = generate_partner_code()
     
     user = User(
         name=user_data.name,
         email=user_data.email,
         password_hash=password_hash,
-        partner_code=partner_code
+        partner_code=partner_code,
+        timezone=user_data.timezone
     )
     
     await db.users.insert_one(user.dict())
@@ -305,7 +752,7 @@ async def register(user_data: UserCreate):
 @api_router.post("/auth/login", response_model=TokenResponse)
 async def login(login_data: UserLogin):
     user = await db.users.find_one({"email": login_data.email})
-    if not user or not verify_password(login_data.password, user["password_hash"]):
+    if not user or not await run_password_task(verify_password, login_data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     access_token = create_access_token(data={"sub": user["id"]})
@@ -325,17 +772,20 @@ async def login(login_data: UserLogin):
         user=user_response
     )
 
-@api_router.get("/auth/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+def to_user_response(user: User) -> UserResponse:
     return UserResponse(
-        id=current_user.id,
-        name=current_user.name,
-        email=current_user.email,
-        partner_code=current_user.partner_code,
-        has_partner=current_user.partner_id is not None,
-        created_at=current_user.created_at
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        partner_code=user.partner_code,
+        has_partner=user.partner_id is not None,
+        created_at=user.created_at
     )
 
+@api_router.get("/auth/me", response_model=UserResponse)
+async def get_me(current_user: User = Depends(get_current_user)):
+    return to_user_response(current_user)
+
 # Couples endpoints
 @api_router.post("/couples/link-partner")
 async def link_partner(couple_data: CoupleCreate, current_user: User = Depends(get_current_user)):
@@ -343,7 +793,7 @@ async def link_partner(couple_data: CoupleCreate, current_user: User = Depends(g
         raise HTTPException(status_code=400, detail="Already have a partner")
     
     # Find partner by code
-    partner = await db.users.find_one({"partner_code": couple_data.code})
+    partner = await db.users.find_one({"partner_code": couple_data.code}, {"_id": 0, "id": 1, "name": 1, "timezone": 1, "partner_id": 1})
     if not partner:
         raise HTTPException(status_code=404, detail="Invalid partner code")
     
@@ -353,63 +803,126 @@ async def link_partner(couple_data: CoupleCreate, current_user: User = Depends(g
     if partner.get("partner_id"):
         raise HTTPException(status_code=400, detail="Partner already linked to someone else")
     
-    # Create couple relationship
+    # Everything the writes depend on is read up front, concurrently
+    user_ids = [current_user.id, partner["id"]]
+    my_mood, partner_mood, counters = await asyncio.gather(
+        db.moods.find_one({"user_id": current_user.id}, sort=[("date", -1)]),
+        db.moods.find_one({"user_id": partner["id"]}, sort=[("date", -1)]),
+        db.user_counters.find(
+            {"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1, "partners_linked": 1, "unlocked": 1}
+        ).to_list(2)
+    )
+    counters = {row["user_id"]: row for row in counters}
+    snapshots = {
+        current_user.id: partner_snapshot(partner["id"], partner["name"], partner.get("timezone"), partner_mood),
+        partner["id"]: partner_snapshot(current_user.id, current_user.name, current_user.timezone, my_mood)
+    }
     couple = Couple(
         code=couple_data.code,
         user1_id=current_user.id,
         user2_id=partner["id"]
     )
-    await db.couples.insert_one(couple.dict())
-    
-    # Update both users
-    await db.users.update_one(
-        {"id": current_user.id},
-        {"$set": {"partner_id": partner["id"]}}
-    )
-    await db.users.update_one(
-        {"id": partner["id"]},
-        {"$set": {"partner_id": current_user.id}}
-    )
-    
-    # Unlock partner linked achievement for both
-    for user_id in [current_user.id, partner["id"]]:
-        existing = await db.achievements.find_one({
+    # Only rules on partners_linked can become due here; other counters are not touched
+    new_achievements = [
+        achievement
+        for user_id in user_ids
+        for achievement in due_achievements({
             "user_id": user_id,
-            "achievement_type": AchievementType.PARTNER_LINKED
+            "partners_linked": counters.get(user_id, {}).get("partners_linked", 0) + 1,
+            "unlocked": counters.get(user_id, {}).get("unlocked", [])
         })
-        if not existing:
-            achievement = Achievement(
-                user_id=user_id,
-                achievement_type=AchievementType.PARTNER_LINKED,
-                title="💕 Corazones Unidos",
-                description="Te vinculaste con tu pareja"
+    ]
+    
+    async def write(session=None):
+        # Guarded on partner_id so a concurrent link to either user cannot be overwritten
+        result = await db.users.bulk_write([
+            UpdateOne(
+                {"id": user_id, "partner_id": None},
+                {"$set": {"partner_id": snapshot.id, "partner": snapshot.dict()}}
             )
-            await db.achievements.insert_one(achievement.dict())
+            for user_id, snapshot in snapshots.items()
+        ], session=session)
+        if result.modified_count != len(user_ids):
+            if session is None and result.modified_count:
+                # No transaction to abort: release the user this request did link
+                await db.users.bulk_write([
+                    UpdateOne({"id": user_id, "partner_id": snapshot.id}, {"$set": {"partner_id": None, "partner": None}})
+                    for user_id, snapshot in snapshots.items()
+                ])
+            raise HTTPException(status_code=409, detail="Partner linking already in progress")
+        
+        await db.couples.insert_one(couple.dict(), session=session)
+        await db.user_counters.bulk_write([
+            UpdateOne(
+                {"user_id": user_id},
+                {
+                    "$inc": {"partners_linked": 1, "data_version": 1},
+                    "$addToSet": {"unlocked": {"$each": [
+                        ach.achievement_type.value for ach in new_achievements if ach.user_id == user_id
+                    ]}}
+                },
+                upsert=True
+            )
+            for user_id in user_ids
+        ], session=session)
+        if new_achievements:
+            await db.achievements.insert_many([ach.dict() for ach in new_achievements], session=session)
+    
+    try:
+        if deployment["transactions"]:
+            async with await client.start_session() as session:
+                await session.with_transaction(write)
+        else:
+            await write()
+    finally:
+        principal_cache.invalidate(*user_ids)
+    await response_cache.invalidate(("dashboard", "achievements"), *user_ids)
+    # Open connections subscribed before the link; this tells them to reconnect
+    for user_id, snapshot in snapshots.items():
+        publish_event(user_id, "partner.linked", partner_id=snapshot.id)
+    for achievement in new_achievements:
+        publish_event(achievement.user_id, "achievement.unlocked", achievement=achievement.dict())
     
     return {"message": "Partner linked successfully"}
 
+def partner_snapshot(partner_id: str, name: str, timezone: str, latest_mood: Optional[dict]) -> PartnerSnapshot:
+    return PartnerSnapshot(
+        id=partner_id,
+        name=name,
+        timezone=timezone or "UTC",
+        latest_mood=latest_mood["mood_emoji"] if latest_mood else None,
+        mood_note=latest_mood["note"] if latest_mood else None,
+        mood_date=latest_mood["date"] if latest_mood else None
+    )
+
+async def update_partner_snapshot(user: User, mood_emoji: str, note: Optional[str], recorded_at: datetime):
+    """Copy a mood into the partner's snapshot of `user`, unless a newer one is already there"""
+    if not user.partner_id:
+        return
+    await db.users.update_one(
+        {"id": user.partner_id, "partner.id": user.id, "$or": [
+            {"partner.mood_date": None}, {"partner.mood_date": {"$lte": recorded_at}}
+        ]},
+        {"$set": {"partner.latest_mood": mood_emoji, "partner.mood_note": note, "partner.mood_date": recorded_at}}
+    )
+    principal_cache.invalidate(user.partner_id)
+
+def partner_summary(user: User) -> Optional[dict]:
+    """Partner profile with their latest mood, or None when there is no partner"""
+    if not user.partner_id or user.partner is None:
+        return None
+    return user.partner.dict()
+
 @api_router.get("/couples/my-partner")
 async def get_my_partner(current_user: User = Depends(get_current_user)):
     if not current_user.partner_id:
         raise HTTPException(status_code=404, detail="No partner linked")
     
-    partner = await db.users.find_one({"id": current_user.partner_id})
-    if not partner:
+    # Served from the snapshot loaded with the principal: no queries
+    partner = partner_summary(current_user)
+    if partner is None:
         raise HTTPException(status_code=404, detail="Partner not found")
-    
-    # Get partner's latest mood
-    latest_mood = await db.moods.find_one(
-        {"user_id": current_user.partner_id},
-        sort=[("date", -1)]
-    )
-    
-    return {
-        "id": partner["id"],
-        "name": partner["name"],
-        "latest_mood": latest_mood["mood_emoji"] if latest_mood else None,
-        "mood_note": latest_mood["note"] if latest_mood else None,
-        "mood_date": latest_mood["date"] if latest_mood else None
-    }
+    return partner
 
 # Activities endpoints
 @api_router.post("/activities/create")
@@ -430,20 +943,45 @@ async def create_activity(activity_data: ActivityCreate, current_user: User = De
     
     await db.activities.insert_one(activity.dict())
     
-    # Check for achievements
-    await check_achievements(current_user.id)
+    # Count the activity for the giver and add it to the receiver's pending badge
+    unlocked, _ = await asyncio.gather(
+        bump_counters(current_user.id, active_days=[local_day(current_user.timezone)], activities_given=1),
+        adjust_pending(activity.receiver_id, 1)
+    )
+    await response_cache.invalidate(("dashboard",), current_user.id, activity.receiver_id)
+    if unlocked:
+        await response_cache.invalidate(("achievements",), current_user.id)
+    publish_event(current_user.id, "activity.created", activity=activity.dict())
     
     return {"message": "Activity created successfully", "activity_id": activity.id}
 
 @api_router.get("/activities/my-activities")
-async def get_my_activities(current_user: User = Depends(get_current_user)):
-    activities = await db.activities.find({"giver_id": current_user.id}).sort("created_at", -1).to_list(None)
-    return serialize_doc(activities)
+async def get_my_activities(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    projection = field_projection(fields, Activity, "created_at")
+    return await conditional_get(request, current_user, lambda etag: paginate(
+        db.activities, {"giver_id": current_user.id}, "created_at", limit, cursor, stream, projection=projection
+    ))
 
 @api_router.get("/activities/partner-activities")
-async def get_partner_activities(current_user: User = Depends(get_current_user)):
-    activities = await db.activities.find({"receiver_id": current_user.id}).sort("created_at", -1).to_list(None)
-    return serialize_doc(activities)
+async def get_partner_activities(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    projection = field_projection(fields, Activity, "created_at")
+    return await conditional_get(request, current_user, lambda etag: paginate(
+        db.activities, {"receiver_id": current_user.id}, "created_at", limit, cursor, stream, projection=projection
+    ))
 
 @api_router.post("/activities/{activity_id}/rate")
 async def rate_activity(activity_id: str, rating_data: ActivityRating, current_user: User = Depends(get_current_user)):
@@ -457,163 +995,659 @@ async def rate_activity(activity_id: str, rating_data: ActivityRating, current_u
     if activity.get("rating"):
         raise HTTPException(status_code=400, detail="Activity already rated")
     
-    await db.activities.update_one(
-        {"id": activity_id},
+    now = datetime.utcnow()
+    # Only a pending activity can be rated, so a concurrent rating cannot apply twice
+    result = await db.activities.update_one(
+        {"id": activity_id, **PENDING_RATING},
         {
             "$set": {
                 "rating": rating_data.rating,
                 "comment": rating_data.comment,
-                "rated_at": datetime.utcnow()
+                "rated_at": now,
+                "updated_at": now
             }
         }
     )
     
-    # Check achievements for the giver
-    await check_achievements(activity["giver_id"])
+    if result.modified_count == 0:
+        raise HTTPException(status_code=400, detail="Activity already rated")
+    
+    # Clear it from the pending badge; five-star ratings count towards the giver's achievements
+    updates = [adjust_pending(current_user.id, -1)]
+    if rating_data.rating == 5:
+        updates.append(bump_counters(activity["giver_id"], five_star_ratings=1))
+    results = await asyncio.gather(*updates)
+    await response_cache.invalidate(("dashboard",), current_user.id, activity["giver_id"])
+    if len(results) > 1 and results[1]:
+        await response_cache.invalidate(("achievements",), activity["giver_id"])
+    publish_event(current_user.id, "activity.rated", activity_id=activity_id, rating=rating_data.rating,
+                  comment=rating_data.comment, rated_at=now)
     
     return {"message": "Activity rated successfully"}
 
 @api_router.get("/activities/pending-ratings")
-async def get_pending_ratings(current_user: User = Depends(get_current_user)):
-    activities = await db.activities.find({
-        "receiver_id": current_user.id,
-        "rating": {"$exists": False}
-    }).sort("created_at", -1).to_list(None)
+async def get_pending_ratings(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    projection = field_projection(fields, Activity, "created_at")
+    query = {"receiver_id": current_user.id, **PENDING_RATING}
+    return await conditional_get(request, current_user, lambda etag: paginate(
+        db.activities, query, "created_at", limit, cursor, stream, projection=projection
+    ))
+
+async def sample_special_memories(user_id: str) -> list:
+    """Pick random 5-star activities (given or received) server-side with $sample"""
+    pipeline = [
+        {"$match": {
+            "$or": [
+                {"giver_id": user_id, "rating": 5},
+                {"receiver_id": user_id, "rating": 5}
+            ]
+        }},
+        {"$sample": {"size": SPECIAL_MEMORIES_COUNT}},
+        {"$project": {"_id": 0}}
+    ]
+    return await db.activities.aggregate(pipeline).to_list(SPECIAL_MEMORIES_COUNT)
+
+async def get_daily_memories(user_id: str, day: str) -> list:
+    """Return the day's pinned selection, sampling it on the first request of the day"""
+    cached = daily_memories_cache.get((user_id, day))
+    if cached is not None:
+        return cached
+    
+    pinned = await db.daily_memories.find_one({"user_id": user_id, "day": day})
+    if pinned:
+        activities = pinned["activities"]
+    else:
+        activities = await sample_special_memories(user_id)
+        try:
+            await db.daily_memories.insert_one({
+                "user_id": user_id,
+                "day": day,
+                "activities": activities,
+                "created_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            # A concurrent request pinned the day first; serve its selection
+            pinned = await db.daily_memories.find_one({"user_id": user_id, "day": day})
+            activities = pinned["activities"]
+    
+    daily_memories_cache.set((user_id, day), activities)
     return activities
 
+@api_router.get("/activities/pending-count")
+async def get_pending_count(current_user: User = Depends(get_current_user)):
+    """Badge count for the pending-ratings inbox, from a single counters read"""
+    counters = await db.user_counters.find_one({"user_id": current_user.id}, {"_id": 0, "pending_count": 1})
+    return {"pending_count": max(0, (counters or {}).get("pending_count", 0))}
+
 @api_router.get("/activities/special-memories")
-async def get_special_memories(current_user: User = Depends(get_current_user)):
-    # Get all 5-star activities (given or received)
-    five_star_activities = await db.activities.find({
-        "$or": [
-            {"giver_id": current_user.id, "rating": 5},
-            {"receiver_id": current_user.id, "rating": 5}
-        ]
-    }).to_list(None)
-    
-    # Randomize and return up to 10
-    random.shuffle(five_star_activities)
-    return serialize_doc(five_star_activities[:10])
+async def get_special_memories(daily: bool = False, current_user: User = Depends(get_current_user)):
+    if daily:
+        return await get_daily_memories(current_user.id, local_day(current_user.timezone))
+    return await sample_special_memories(current_user.id)
 
 # Moods endpoints
 @api_router.post("/moods/create")
 async def create_mood(mood_data: MoodCreate, current_user: User = Depends(get_current_user)):
-    # Check if mood already exists for today
-    today = datetime.utcnow().date()
-    existing_mood = await db.moods.find_one({
-        "user_id": current_user.id,
-        "date": {
-            "$gte": datetime.combine(today, datetime.min.time()),
-            "$lt": datetime.combine(today, datetime.max.time())
-        }
-    })
+    # One mood per user per local day, enforced by the unique (user_id, day) index
+    mood = Mood(
+        user_id=current_user.id,
+        mood_emoji=mood_data.mood_emoji,
+        note=mood_data.note,
+        day=local_day(current_user.timezone)
+    )
+    changes = {
+        "$set": {"mood_emoji": mood.mood_emoji, "note": mood.note, "date": mood.date, "updated_at": mood.date},
+        "$setOnInsert": {"id": mood.id}
+    }
+    try:
+        result = await db.moods.update_one({"user_id": mood.user_id, "day": mood.day}, changes, upsert=True)
+    except DuplicateKeyError:
+        # A concurrent submission inserted today's mood first; update it instead
+        result = await db.moods.update_one({"user_id": mood.user_id, "day": mood.day}, changes)
     
-    if existing_mood:
-        # Update existing mood
-        await db.moods.update_one(
-            {"id": existing_mood["id"]},
-            {
-                "$set": {
-                    "mood_emoji": mood_data.mood_emoji,
-                    "note": mood_data.note,
-                    "date": datetime.utcnow()
-                }
-            }
-        )
+    await update_partner_snapshot(current_user, mood.mood_emoji, mood.note, mood.date)
+    publish_event(current_user.id, "mood", mood={
+        "mood_emoji": mood.mood_emoji, "note": mood.note, "date": mood.date, "day": mood.day
+    })
+    if result.upserted_id is None:
+        await bump_data_version(current_user.id)
+        await response_cache.invalidate(("moods",), current_user.id)
         return {"message": "Mood updated successfully"}
-    else:
-        # Create new mood
-        mood = Mood(
-            user_id=current_user.id,
-            mood_emoji=mood_data.mood_emoji,
-            note=mood_data.note
-        )
-        await db.moods.insert_one(mood.dict())
-        return {"message": "Mood created successfully"}
+    
+    # A new mood day can extend the streak and unlock achievements
+    unlocked = await bump_counters(current_user.id, active_days=[mood.day], mood_days=1)
+    await response_cache.invalidate(("moods", "dashboard", "achievements") if unlocked else ("moods", "dashboard"),
+                                    current_user.id)
+    return {"message": "Mood created successfully"}
 
 @api_router.get("/moods/my-moods")
-async def get_my_moods(current_user: User = Depends(get_current_user)):
-    moods = await db.moods.find({"user_id": current_user.id}).sort("date", -1).to_list(30)
-    return serialize_doc(moods)
+async def get_my_moods(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    projection = field_projection(fields, Mood, "date")
+    return await conditional_get(request, current_user, lambda etag: cached_feed(
+        "moods", current_user.id, etag, db.moods, {"user_id": current_user.id}, "date",
+        limit, cursor, stream, legacy_limit=30, projection=projection
+    ))
+
+def partner_day(user: User) -> str:
+    """Today in the partner's timezone, the day their moods are keyed by"""
+    return local_day(user.partner.timezone if user.partner else user.timezone)
+
+async def fetch_partner_mood_today(user: User) -> Optional[dict]:
+    if not user.partner_id:
+        return None
+    return await db.moods.find_one(
+        {"user_id": user.partner_id, "day": partner_day(user)},
+        {"_id": 0}
+    )
 
 @api_router.get("/moods/partner-mood")
-async def get_partner_mood(current_user: User = Depends(get_current_user)):
+async def get_partner_mood(request: Request, current_user: User = Depends(get_current_user)):
     if not current_user.partner_id:
         raise HTTPException(status_code=404, detail="No partner linked")
     
-    # Get today's mood
-    today = datetime.utcnow().date()
-    mood = await db.moods.find_one({
-        "user_id": current_user.partner_id,
-        "date": {
-            "$gte": datetime.combine(today, datetime.min.time()),
-            "$lt": datetime.combine(today, datetime.max.time())
-        }
-    })
-    
-    return serialize_doc(mood)
+    # Get the partner's mood for their today
+    return await conditional_get(
+        request, current_user, lambda etag: fetch_partner_mood_today(current_user), partner_day(current_user)
+    )
 
 # Achievements endpoints
 @api_router.get("/achievements/my-achievements")
-async def get_my_achievements(current_user: User = Depends(get_current_user)):
-    achievements = await db.achievements.find({"user_id": current_user.id}).sort("unlocked_at", -1).to_list(None)
-    return serialize_doc(achievements)
+async def get_my_achievements(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    projection = field_projection(fields, Achievement, "unlocked_at")
+    return await conditional_get(request, current_user, lambda etag: cached_feed(
+        "achievements", current_user.id, etag, db.achievements, {"user_id": current_user.id},
+        "unlocked_at", limit, cursor, stream, projection=projection
+    ))
 
 @api_router.get("/achievements/check-new")
 async def check_new_achievements(current_user: User = Depends(get_current_user)):
-    await check_achievements(current_user.id)
+    if await check_achievements(current_user.id):
+        await response_cache.invalidate(("achievements",), current_user.id)
     return {"message": "Achievements checked"}
 
-# Dashboard endpoint
-@api_router.get("/dashboard/stats", response_model=DashboardStats)
-async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
-    # Activities given
-    total_given = await db.activities.count_documents({"giver_id": current_user.id})
-    
-    # Activities received
-    total_received = await db.activities.count_documents({"receiver_id": current_user.id})
-    
-    # Average rating given (ratings for activities I gave)
-    given_activities = await db.activities.find({
-        "giver_id": current_user.id,
-        "rating": {"$exists": True, "$ne": None}
-    }).to_list(None)
-    avg_rating_given = sum(act["rating"] for act in given_activities if act["rating"] is not None) / len(given_activities) if given_activities else 0
-    
-    # Average rating received (ratings I gave to received activities)
-    received_activities = await db.activities.find({
-        "receiver_id": current_user.id,
-        "rating": {"$exists": True, "$ne": None}
-    }).to_list(None)
-    avg_rating_received = sum(act["rating"] for act in received_activities if act["rating"] is not None) / len(received_activities) if received_activities else 0
-    
-    # Pending ratings
-    pending = await db.activities.count_documents({
-        "receiver_id": current_user.id,
-        "rating": {"$exists": False}
-    })
+# Sync endpoints
+def to_utc_naive(moment: Optional[datetime], now: datetime) -> datetime:
+    """Normalize a client timestamp to naive UTC, never later than now"""
+    if moment is None:
+        return now
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+    return min(moment, now)
+
+async def run_bulk(collection, operations: list, ordered: bool = False) -> dict:
+    """bulk_write that treats duplicate-key errors as per-item outcomes, not failures"""
+    if not operations:
+        return {"upserted": [], "writeErrors": [], "nModified": 0}
+    try:
+        result = await collection.bulk_write(operations, ordered=ordered)
+        return result.bulk_api_result
+    except BulkWriteError as e:
+        if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+            raise
+        return e.details
+
+async def sync_activities(user: User, items: List[QueuedActivity], now: datetime) -> list:
+    statuses = [{"client_key": item.client_key, "status": "rejected"} for item in items]
+    operations, positions, activity_ids = [], [], []
+    for position, item in enumerate(items):
+        if not user.partner_id or (item.receiver_id or user.partner_id) != user.partner_id:
+            continue
+        activity = Activity(
+            title=item.title,
+            description=item.description,
+            category=item.category,
+            giver_id=user.id,
+            receiver_id=user.partner_id,
+            created_at=to_utc_naive(item.created_at, now)
+        )
+        # Replays match the existing document and leave it untouched
+        operations.append(UpdateOne(
+            {"giver_id": user.id, "client_key": item.client_key},
+            {"$setOnInsert": {**activity.dict(), "client_key": item.client_key}},
+            upsert=True
+        ))
+        positions.append(position)
+        activity_ids.append(activity.id)
     
-    # Achievements count
-    achievements = await db.achievements.count_documents({"user_id": current_user.id})
+    result = await run_bulk(db.activities, operations)
+    for position in positions:
+        statuses[position]["status"] = "duplicate"
+    for upserted in result["upserted"]:
+        statuses[positions[upserted["index"]]].update(
+            status="created", activity_id=activity_ids[upserted["index"]]
+        )
+    return statuses
+
+async def sync_ratings(user: User, items: List[QueuedRating], now: datetime):
+    statuses = [{"client_key": item.client_key, "status": "rejected"} for item in items]
+    if not items:
+        return statuses, {}
+    activities = {
+        act["id"]: act
+        for act in await db.activities.find(
+            {"id": {"$in": [item.activity_id for item in items]}, "receiver_id": user.id},
+            {"_id": 0, "id": 1, "giver_id": 1, "rating": 1}
+        ).to_list(None)
+    }
     
-    # Current streak (simplified - consecutive days with activities)
-    current_streak = 0  # TODO: Implement proper streak calculation
+    operations, positions = [], []
+    for position, item in enumerate(items):
+        activity = activities.get(item.activity_id)
+        if activity is None:
+            continue
+        if activity.get("rating") is not None:
+            statuses[position]["status"] = "duplicate"
+            continue
+        # Guarded on the pending predicate so a replay or a concurrent rating cannot overwrite
+        operations.append(UpdateOne(
+            {"id": item.activity_id, **PENDING_RATING},
+            {"$set": {"rating": item.rating, "comment": item.comment, "rated_at": now, "updated_at": now}}
+        ))
+        positions.append(position)
+        activity["rating"] = item.rating  # a second rating in the same batch is a duplicate
+    
+    result = await run_bulk(db.activities, operations)
+    applied = set(positions)
+    if result["nModified"] != len(operations):
+        # Some lost a race with another rating; rated_at tells which ones were ours
+        ours = set(await db.activities.distinct(
+            "id", {"id": {"$in": [items[p].activity_id for p in positions]}, "rated_at": now}
+        ))
+        applied = {p for p in positions if items[p].activity_id in ours}
+    five_stars = {}
+    for position in positions:
+        statuses[position]["status"] = "rated" if position in applied else "duplicate"
+        if position in applied and items[position].rating == 5:
+            giver_id = activities[items[position].activity_id]["giver_id"]
+            five_stars[giver_id] = five_stars.get(giver_id, 0) + 1
+    return statuses, five_stars
+
+async def sync_moods(user: User, items: List[QueuedMood], now: datetime) -> list:
+    statuses = [{"client_key": item.client_key, "status": "stale"} for item in items]
+    
+    # Only the most recent item per day is written; earlier ones are stale
+    latest = {}
+    for position, item in enumerate(items):
+        recorded_at = to_utc_naive(item.recorded_at, now)
+        day = local_day(user.timezone, recorded_at)
+        if day not in latest or recorded_at >= latest[day][1]:
+            latest[day] = (position, recorded_at)
+    
+    operations, positions = [], []
+    for day, (position, recorded_at) in latest.items():
+        item = items[position]
+        # Only overwrite a mood recorded earlier that day; an older replay hits the
+        # unique (user_id, day) index on upsert and is reported as stale
+        operations.append(UpdateOne(
+            {"user_id": user.id, "day": day, "date": {"$lte": recorded_at}},
+            {
+                "$set": {"mood_emoji": item.mood_emoji, "note": item.note, "date": recorded_at, "updated_at": now},
+                "$setOnInsert": {"id": str(uuid.uuid4())}
+            },
+            upsert=True
+        ))
+        positions.append(position)
+    
+    result = await run_bulk(db.moods, operations)
+    failed = {err["index"] for err in result["writeErrors"]}
+    created = {upserted["index"] for upserted in result["upserted"]}
+    for index, position in enumerate(positions):
+        if index in created:
+            statuses[position]["status"] = "created"
+        elif index not in failed:
+            statuses[position]["status"] = "updated"
+    return statuses
+
+def encode_sync_token(moment: datetime, doc_id: str = "") -> str:
+    """Opaque (updated_at, id) keyset position; an empty id resumes at the moment itself"""
+    raw = json.dumps([moment.isoformat(), doc_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip("=")
+
+def decode_sync_token(token: str):
+    """(updated_at as naive UTC, id); bare timestamps from older clients resume at that moment"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode('utf-8')
+        if raw.startswith("["):
+            timestamp, doc_id = json.loads(raw)
+        else:
+            timestamp, doc_id = raw, ""
+        moment = datetime.fromisoformat(timestamp)
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+        return moment, str(doc_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+async def fetch_changes(collection, owner_filter: dict, since: Optional[tuple]):
+    """Documents changed after the (updated_at, id) position, oldest first; returns (docs, truncated)"""
+    query = owner_filter
+    if since is not None:
+        moment, doc_id = since
+        query = {"$and": [owner_filter, {"$or": [
+            {"updated_at": {"$gt": moment}},
+            {"updated_at": moment, "id": {"$gt": doc_id}}
+        ]}]}
+    docs = await collection.find(query, {"_id": 0}).sort([("updated_at", 1), ("id", 1)]).to_list(SYNC_MAX_DOCS + 1)
+    return docs[:SYNC_MAX_DOCS], len(docs) > SYNC_MAX_DOCS
+
+@api_router.get("/sync")
+async def sync_pull(since: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    """Activities, moods and achievements created or changed since the token.
+
+    Omit `since` for a full snapshot. Pass the returned next_token on the
+    following call; while has_more is true, call again straight away.
+    """
+    started_at = datetime.utcnow()
+    since_at = decode_sync_token(since) if since else None
+    
+    (given, given_more), (received, received_more), (moods, moods_more), (achievements, achievements_more) = \
+        await asyncio.gather(
+            fetch_changes(db.activities, {"giver_id": current_user.id}, since_at),
+            fetch_changes(db.activities, {"receiver_id": current_user.id}, since_at),
+            fetch_changes(db.moods, {"user_id": current_user.id}, since_at),
+            fetch_changes(db.achievements, {"user_id": current_user.id}, since_at)
+        )
+    
+    # Resume right after the earliest document any truncated list stopped at;
+    # the position only moves forward, so ties on updated_at cannot stall it
+    next_at = (started_at - SYNC_TOKEN_OVERLAP, "")
+    has_more = False
+    for docs, more in ((given, given_more), (received, received_more), (moods, moods_more),
+                       (achievements, achievements_more)):
+        if more:
+            has_more = True
+            next_at = min(next_at, (docs[-1]["updated_at"], docs[-1]["id"]))
+    if since_at is not None:
+        next_at = max(next_at, since_at)
+    
+    return {
+        "activities": given + received,
+        "moods": moods,
+        "achievements": achievements,
+        "next_token": encode_sync_token(*next_at),
+        "has_more": has_more
+    }
+
+@api_router.post("/sync/push")
+async def sync_push(batch: SyncBatch, current_user: User = Depends(get_current_user)):
+    """Apply a queue of offline writes with one bulk_write per collection.
+
+    Every item carries a client_key; replaying a batch is safe and reports
+    already-applied items as duplicates. Achievements are evaluated once per
+    affected user, not once per item.
+    """
+    now = datetime.utcnow()
+    activity_statuses = await sync_activities(current_user, batch.activities, now)
+    rating_statuses, five_stars = await sync_ratings(current_user, batch.ratings, now)
+    mood_statuses = await sync_moods(current_user, batch.moods, now)
+    
+    # The newest mood written reaches the partner's snapshot
+    written = [
+        (to_utc_naive(item.recorded_at, now), item)
+        for item, st in zip(batch.moods, mood_statuses) if st["status"] in ("created", "updated")
+    ]
+    if written:
+        recorded_at, item = max(written, key=lambda pair: pair[0])
+        await update_partner_snapshot(current_user, item.mood_emoji, item.note, recorded_at)
+    
+    # One counters update per affected user: the caller, the partner and any giver
+    created = sum(1 for st in activity_statuses if st["status"] == "created")
+    increments = {current_user.id: {
+        "activities_given": created,
+        "mood_days": sum(1 for st in mood_statuses if st["status"] == "created"),
+        "pending_count": -sum(1 for st in rating_statuses if st["status"] == "rated"),
+    }}
+    if created:
+        increments.setdefault(current_user.partner_id, {})["pending_count"] = created
+    for giver_id, count in five_stars.items():
+        increments.setdefault(giver_id, {})["five_star_ratings"] = count
+    
+    # Newly logged activities and moods extend the caller's streak on their own days
+    active_days = [
+        local_day(current_user.timezone, to_utc_naive(item.created_at, now))
+        for item, st in zip(batch.activities, activity_statuses) if st["status"] == "created"
+    ] + [
+        local_day(current_user.timezone, to_utc_naive(item.recorded_at, now))
+        for item, st in zip(batch.moods, mood_statuses) if st["status"] == "created"
+    ]
+    
+    for user_id, counters in increments.items():
+        counters = {counter: value for counter, value in counters.items() if value}
+        days = active_days if user_id == current_user.id else None
+        # Always run for the caller: rewritten moods change no counter but their data version
+        if counters or days or user_id == current_user.id:
+            await bump_counters(user_id, active_days=days, **counters)
+    owners = set(increments) | ({current_user.partner_id} if current_user.partner_id else set())
+    await response_cache.invalidate(CACHED_ROUTES, *owners)
+    # Offline batches are announced as one event; clients refetch rather than replay them
+    written = ("created", "updated", "rated")
+    if any(st["status"] in written for st in activity_statuses + rating_statuses + mood_statuses):
+        publish_event(current_user.id, "sync")
+    
+    return {
+        "activities": activity_statuses,
+        "ratings": rating_statuses,
+        "moods": mood_statuses
+    }
+
+# Dashboard endpoint
+def current_streak(counters: dict, timezone: str) -> int:
+    """The stored streak, or 0 once a whole local day has passed without activity"""
+    yesterday = (date.fromisoformat(local_day(timezone)) - timedelta(days=1)).isoformat()
+    if counters.get("last_active_day", "") < yesterday:
+        return 0
+    return counters.get("current_streak", 0)
+
+async def compute_dashboard_stats(user_id: str, timezone: str = "UTC") -> DashboardStats:
+    """Compute every dashboard figure in a single aggregation round trip"""
+    pipeline = [
+        {"$match": {"$or": [{"giver_id": user_id}, {"receiver_id": user_id}]}},
+        {"$facet": {
+            "given": [
+                {"$match": {"giver_id": user_id}},
+                {"$group": {"_id": None, "count": {"$sum": 1}, "avg_rating": {"$avg": "$rating"}}}
+            ],
+            "received": [
+                {"$match": {"receiver_id": user_id}},
+                {"$group": {"_id": None, "count": {"$sum": 1}, "avg_rating": {"$avg": "$rating"}}}
+            ],
+        }},
+        # $facet always emits exactly one document, so the lookups run once
+        {"$lookup": {
+            "from": "achievements",
+            "pipeline": [{"$match": {"user_id": user_id}}, {"$count": "count"}],
+            "as": "achievements"
+        }},
+        # The pending badge and streak are maintained by the write handlers, not recounted
+        {"$lookup": {
+            "from": "user_counters",
+            "pipeline": [
+                {"$match": {"user_id": user_id}},
+                {"$project": {"_id": 0, "pending_count": 1, "current_streak": 1, "last_active_day": 1}}
+            ],
+            "as": "counters"
+        }}
+    ]
+    result = (await db.activities.aggregate(pipeline).to_list(1))[0]
+    
+    given = result["given"][0] if result["given"] else {}
+    received = result["received"][0] if result["received"] else {}
+    counters = result["counters"][0] if result["counters"] else {}
     
     return DashboardStats(
-        total_activities_given=total_given,
-        total_activities_received=total_received,
-        average_rating_given=round(avg_rating_given, 1),
-        average_rating_received=round(avg_rating_received, 1),
-        current_streak=current_streak,
-        achievements_count=achievements,
-        pending_ratings=pending
+        total_activities_given=given.get("count", 0),
+        total_activities_received=received.get("count", 0),
+        average_rating_given=round(given.get("avg_rating") or 0, 1),
+        average_rating_received=round(received.get("avg_rating") or 0, 1),
+        current_streak=current_streak(counters, timezone),
+        achievements_count=result["achievements"][0]["count"] if result["achievements"] else 0,
+        pending_ratings=max(0, counters.get("pending_count", 0))
+    )
+
+@api_router.get("/dashboard/stats", response_model=DashboardStats)
+async def get_dashboard_stats(request: Request, current_user: User = Depends(get_current_user)):
+    # The streak lapses with the local day, without any write
+    today = local_day(current_user.timezone)
+    return await conditional_get(request, current_user, lambda etag: cached_json(
+        "dashboard", current_user.id, etag, "", lambda: compute_dashboard_stats(current_user.id, current_user.timezone)
+    ), today)
+
+# Home endpoint
+@api_router.get("/home")
+async def get_home(request: Request, current_user: User = Depends(get_current_user)):
+    """Everything the home and partner tabs need, authenticated once and fetched concurrently"""
+    async def respond(etag: str):
+        # The partner fields are re-read rather than taken from the principal
+        # cache, which another worker may not have invalidated yet: the body
+        # must be at least as new as the versions in its ETag
+        linked, partner_mood, stats = await asyncio.gather(
+            db.users.find_one({"id": current_user.id}, {"_id": 0, "partner_id": 1, "partner": 1}),
+            fetch_partner_mood_today(current_user),
+            compute_dashboard_stats(current_user.id, current_user.timezone)
+        )
+        user = current_user.copy(update={
+            "partner_id": (linked or {}).get("partner_id"),
+            "partner": PartnerSnapshot(**linked["partner"]) if linked and linked.get("partner") else None
+        })
+        return {
+            "user": to_user_response(user),
+            "partner": partner_summary(user),
+            "partner_mood": partner_mood,
+            "stats": stats
+        }
+    
+    return await conditional_get(
+        request, current_user, respond, local_day(current_user.timezone), partner_day(current_user)
     )
 
+# Real-time endpoint
+@api_router.websocket("/events/ws")
+async def events_socket(websocket: WebSocket):
+    """Push the couple's moods, activities, ratings and achievement unlocks as JSON messages.
+
+    The token comes in the Authorization header only: query strings end up in
+    access logs.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    token = authorization[7:] if authorization.lower().startswith("bearer ") else ""
+    try:
+        user = await authenticate(token)
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+    
+    await websocket.accept()
+    
+    subscription = None
+    tasks = []
+    try:
+        # Only an accepted connection takes a hub slot, released below whatever happens next
+        subscription = event_hub.subscribe(user.id, *([user.partner_id] if user.partner_id else []))
+        
+        async def forward():
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), REALTIME_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    event = {"type": "ping"}
+                await websocket.send_text(dump_json(event).decode("utf-8"))
+        
+        async def drain():
+            # Clients only listen; reading is how a disconnect is noticed
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        
+        tasks = [asyncio.create_task(forward()), asyncio.create_task(drain())]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.info(f"Event stream for {user.id} closed: {task.exception()!r}")
+    except HubFull:
+        await websocket.close(code=1013)  # try again later
+    finally:
+        for task in tasks:
+            task.cancel()
+        if subscription is not None:
+            event_hub.unsubscribe(subscription)
+
 @api_router.get("/")
 async def root():
     return {"message": "LoveActs V2.0 API", "version": "2.0.0"}
 
+# Operational endpoints
+@internal_router.get("/stats")
+async def get_internal_stats():
+    """Runtime counters for sizing pools and caches"""
+    return {
+        "password_pool": get_password_pool_stats(),
+        "principal_cache": principal_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "realtime": event_hub.stats()
+    }
+
+@internal_router.get("/indexes")
+async def get_index_report():
+    """Index drift found at startup: built, mismatched, unknown, redundant and unused indexes"""
+    return index_report
+
+@internal_router.get("/slow-queries")
+async def get_slow_queries():
+    """Slow query shapes seen since startup, slowest first, with their explained plans"""
+    return {
+        "threshold_ms": slow_query_detector.threshold_ms,
+        "shapes": slow_query_detector.report()
+    }
+
+password_pool_queue_depth = metrics.registry.register(metrics.Gauge(
+    "password_pool_queue_depth", "bcrypt calls waiting for a password pool worker"
+))
+password_pool_rejected = metrics.registry.register(metrics.Counter(
+    "password_pool_rejected_total", "bcrypt calls shed because the password pool queue was full"
+))
+principal_cache_lookups = metrics.registry.register(metrics.Counter(
+    "principal_cache_lookups_total", "Principal cache lookups by result", labels=("result",)
+))
+response_cache_lookups = metrics.registry.register(metrics.Counter(
+    "response_cache_lookups_total", "Response cache lookups by route and result", labels=("route", "result")
+))
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    pool = get_password_pool_stats()
+    password_pool_queue_depth.set(pool["queue_depth"])
+    password_pool_rejected.set(pool["rejected"])
+    principal_cache_lookups.set(principal_cache.hits, result="hit")
+    principal_cache_lookups.set(principal_cache.misses, result="miss")
+    for route, count in response_cache.hits.items():
+        response_cache_lookups.set(count, route=route, result="hit")
+    for route, count in response_cache.misses.items():
+        response_cache_lookups.set(count, route=route, result="miss")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 # Include the router in the main app
+api_router.include_router(internal_router)
 app.include_router(api_router)
 
 app.add_middleware(
@@ -623,6 +1657,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    NegotiationMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_BYTES', '1024')),
+    offload_size=int(os.environ.get('COMPRESSION_OFFLOAD_BYTES', '65536'))
+)
+app.add_middleware(metrics.RequestMetricsMiddleware)
 
 # Configure logging
 logging.basicConfig(
@@ -634,8 +1674,11 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     await setup_indexes()
+    await detect_deployment()
     logger.info("LoveActs V2.0 API started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+    password_executor.shutdown(wait=False)
+    slow_query_detector.close()
\ No newline at end of file
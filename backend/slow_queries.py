@@ -0,0 +1,191 @@
+"""Slow-operation detection with automatic explain capture.
+
+SlowQueryListener watches every MongoDB command the API's Motor client runs.
+Commands slower than the threshold are reduced to a query shape (field
+names and operators, no values). The first time a shape is seen, the
+original command is explained once on a background thread and the winning
+plan is summarized (COLLSCAN, index used, keys and docs examined), so
+missing indexes surface from real traffic.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Commands whose plans explain can describe; getMore belongs to its find/aggregate
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Session and transport fields explain does not accept
+DRIVER_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "$clusterTime", "$db", "$readPreference"}
+
+
+def value_shape(value):
+    """Replace literals with their type name, keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: value_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        shapes = []
+        for item in value:
+            shape = value_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return type(value).__name__
+
+
+def command_shape(command_name: str, command: dict) -> dict:
+    """The parts of a command that decide its plan"""
+    if command_name == "find":
+        return {"filter": value_shape(command.get("filter", {})), "sort": command.get("sort")}
+    if command_name == "aggregate":
+        return {"pipeline": value_shape(command.get("pipeline", []))}
+    if command_name in ("count", "distinct"):
+        return {"query": value_shape(command.get("query", {})), "key": command.get("key")}
+    if command_name == "findAndModify":
+        return {"query": value_shape(command.get("query", {})), "sort": command.get("sort")}
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes", [])
+        return {"q": [value_shape(statement.get("q", {})) for statement in statements]}
+    return {}
+
+
+def find_key(document, key: str):
+    """Depth-first search for `key` in nested explain output"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def plan_stages(plan) -> list:
+    """Flatten a winning plan into stage names, with the index for IXSCANs"""
+    stages = []
+    while isinstance(plan, dict):
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage} {plan['indexName']}"
+        stages.append(stage)
+        if "inputStages" in plan:
+            for child in plan["inputStages"]:
+                stages.extend(plan_stages(child))
+            break
+        plan = plan.get("inputStage") or plan.get("queryPlan")
+    return stages
+
+
+def summarize_explain(explain: dict) -> dict:
+    winning_plan = find_key(explain, "winningPlan") or {}
+    stats = find_key(explain, "executionStats") or {}
+    stages = plan_stages(winning_plan)
+    return {
+        "stages": stages,
+        "collscan": any(stage.startswith("COLLSCAN") for stage in stages),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryDetector:
+    """Keeps one entry per slow query shape and explains each shape once"""
+
+    def __init__(self, mongo_url: str, threshold_ms: float, max_shapes: int = 500):
+        self.mongo_url = mongo_url
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        self.shapes = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self._client = None
+
+    def record(self, database: str, command_name: str, command: dict, duration_ms: float):
+        collection = command.get(command_name)
+        shape = command_shape(command_name, command)
+        key = json.dumps([database, collection, command_name, shape], sort_keys=True, default=str)
+        with self._lock:
+            entry = self.shapes.get(key)
+            if entry is None:
+                if len(self.shapes) >= self.max_shapes:
+                    return
+                entry = self.shapes[key] = {
+                    "database": database,
+                    "collection": collection,
+                    "command": command_name,
+                    "shape": shape,
+                    "count": 0,
+                    "max_ms": 0.0,
+                    "plan": None,
+                }
+                self._executor.submit(self._explain, entry, database, command_name, command)
+            entry["count"] += 1
+            entry["last_ms"] = round(duration_ms, 2)
+            entry["max_ms"] = max(entry["max_ms"], round(duration_ms, 2))
+            entry["last_seen"] = time.time()
+        logger.warning(f"Slow {command_name} on {database}.{collection}: {duration_ms:.1f} ms")
+
+    def _explain(self, entry: dict, database: str, command_name: str, command: dict):
+        if self._client is None:
+            # A separate client without listeners, so explains are never measured themselves
+            self._client = MongoClient(self.mongo_url, serverSelectionTimeoutMS=2000)
+        explained = {key: value for key, value in command.items() if key not in DRIVER_FIELDS}
+        if command_name == "aggregate":
+            explained["cursor"] = {}
+        try:
+            result = self._client[database].command({"explain": explained, "verbosity": "executionStats"})
+        except PyMongoError as e:
+            entry["plan"] = {"error": str(e)}
+            return
+        entry["plan"] = summarize_explain(result)
+        plan = entry["plan"]
+        logger.warning(
+            f"Explain {command_name} on {database}.{entry['collection']}: {' > '.join(plan['stages'])}, "
+            f"keys examined {plan['keys_examined']}, docs examined {plan['docs_examined']}, "
+            f"returned {plan['returned']}"
+        )
+
+    def report(self) -> list:
+        with self._lock:
+            entries = [dict(entry) for entry in self.shapes.values()]
+        return sorted(entries, key=lambda entry: entry["max_ms"], reverse=True)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._client is not None:
+            self._client.close()
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Hands commands slower than the detector's threshold to the detector"""
+
+    def __init__(self, detector: SlowQueryDetector):
+        self.detector = detector
+        self._started = {}
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            self._started[event.request_id] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        started = self._started.pop(event.request_id, None)
+        duration_ms = event.duration_micros / 1000
+        if started and duration_ms >= self.detector.threshold_ms:
+            database, command = started
+            self.detector.record(database, event.command_name, command, duration_ms)
+
+    def failed(self, event):
+        self._started.pop(event.request_id, None)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+LoveActs V2.0 Dashboard Stats Benchmark
+Compares the single-aggregation dashboard engine against the original
+seven-query implementation on a scratch database.
+
+Usage:
+    python benchmarks/dashboard_stats_benchmark.py [--sizes 10000 100000] [--runs 20]
+
+MONGO_URL is read from the environment (or backend/.env). The benchmark
+writes to BENCH_DB_NAME (default: loveacts_bench) and drops it afterwards.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "loveacts_bench")
+
+import server  # noqa: E402
+from server import db, DashboardStats, PENDING_RATING  # noqa: E402
+
+CATEGORIES = ["físico", "emocional", "práctico", "general"]
+
+
+async def legacy_dashboard_stats(user_id: str) -> DashboardStats:
+    """Original implementation: seven sequential round trips.
+
+    Uses the current pending-rating predicate so only the query strategy differs.
+    """
+    total_given = await db.activities.count_documents({"giver_id": user_id})
+    total_received = await db.activities.count_documents({"receiver_id": user_id})
+    given_activities = await db.activities.find({
+        "giver_id": user_id,
+        "rating": {"$exists": True, "$ne": None}
+    }).to_list(None)
+    avg_rating_given = sum(act["rating"] for act in given_activities if act["rating"] is not None) / len(given_activities) if given_activities else 0
+    received_activities = await db.activities.find({
+        "receiver_id": user_id,
+        "rating": {"$exists": True, "$ne": None}
+    }).to_list(None)
+    avg_rating_received = sum(act["rating"] for act in received_activities if act["rating"] is not None) / len(received_activities) if received_activities else 0
+    pending = await db.activities.count_documents({
+        "receiver_id": user_id,
+        **PENDING_RATING
+    })
+    achievements = await db.achievements.count_documents({"user_id": user_id})
+    return DashboardStats(
+        total_activities_given=total_given,
+        total_activities_received=total_received,
+        average_rating_given=round(avg_rating_given, 1),
+        average_rating_received=round(avg_rating_received, 1),
+        current_streak=0,
+        achievements_count=achievements,
+        pending_ratings=pending
+    )
+
+
+async def seed(size: int):
+    """Seed one couple where each partner gave `size` activities"""
+    await db.activities.drop()
+    await db.achievements.drop()
+    await db.user_counters.drop()
+    await server.setup_indexes()
+
+    user_a, user_b = str(uuid.uuid4()), str(uuid.uuid4())
+    now = datetime.utcnow()
+    batch = []
+    pending = {user_a: 0, user_b: 0}
+    for giver, receiver in ((user_a, user_b), (user_b, user_a)):
+        for i in range(size):
+            doc = {
+                "id": str(uuid.uuid4()),
+                "title": f"Actividad {i}",
+                "description": "Generada para benchmark",
+                "category": random.choice(CATEGORIES),
+                "giver_id": giver,
+                "receiver_id": receiver,
+                "rating": None,
+                "comment": None,
+                "created_at": now - timedelta(minutes=i),
+                "rated_at": None,
+            }
+            # ~90% of activities end up rated, the rest stay pending
+            if random.random() < 0.9:
+                doc["rating"] = random.choices([1, 2, 3, 4, 5], weights=[2, 3, 10, 30, 55])[0]
+                doc["rated_at"] = now
+            else:
+                pending[receiver] += 1
+            batch.append(doc)
+            if len(batch) >= 5000:
+                await db.activities.insert_many(batch)
+                batch = []
+    if batch:
+        await db.activities.insert_many(batch)
+    await db.achievements.insert_many([
+        {"id": str(uuid.uuid4()), "user_id": user_a, "achievement_type": t, "unlocked_at": now}
+        for t in ("first_activity", "ten_activities", "partner_linked")
+    ])
+    # The new engine reads the maintained pending badge instead of recounting
+    await db.user_counters.insert_many([
+        {"user_id": user_id, "pending_count": count} for user_id, count in pending.items()
+    ])
+    return user_a
+
+
+async def time_runs(func, user_id: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = await func(user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, timings
+
+
+def describe(label: str, timings):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"   {label:<12} mean {statistics.mean(timings):8.2f} ms   "
+          f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+    return statistics.median(timings)
+
+
+async def main(sizes, runs: int):
+    print("🚀 LoveActs V2.0 Dashboard Stats Benchmark")
+    print("=" * 60)
+    try:
+        for size in sizes:
+            print(f"\n📋 {size:,} activities per user")
+            user_id = await seed(size)
+
+            # Warm up caches and the query planner once for each implementation
+            await legacy_dashboard_stats(user_id)
+            await server.compute_dashboard_stats(user_id)
+
+            legacy_result, legacy_timings = await time_runs(legacy_dashboard_stats, user_id, runs)
+            new_result, new_timings = await time_runs(server.compute_dashboard_stats, user_id, runs)
+
+            if legacy_result != new_result:
+                print(f"   ❌ Results differ:\n      legacy: {legacy_result}\n      facet:  {new_result}")
+            else:
+                print("   ✅ Results match")
+
+            legacy_p50 = describe("legacy", legacy_timings)
+            new_p50 = describe("$facet", new_timings)
+            print(f"   Speedup (p50): {legacy_p50 / new_p50:.1f}x")
+    finally:
+        await server.client.drop_database(os.environ["DB_NAME"])
+        server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.runs))
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+LoveActs V2.0 Synthetic Data Generator
+Fills a database with production-sized couples, activities, moods,
+achievements and counters matching the models in backend/server.py.
+
+Work is split into chunks of couples. Every chunk is generated from its own
+RNG seeded with (--seed, chunk number), so a dataset is reproducible
+regardless of worker count, and a chunk can be regenerated after a crash.
+Finished chunks are recorded in the `_generator_progress` collection; rerun
+the same command to resume.
+
+Usage:
+    python benchmarks/generate_data.py --couples 100000 --workers 8 [--seed 42]
+                                       [--days 730] [--db-name loveacts_synthetic]
+                                       [--reset] [--skip-indexes]
+"""
+
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import random
+import string
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import bcrypt
+from pymongo import MongoClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+FIRST_NAMES = [
+    "Ana", "Lucía", "Sofía", "Valentina", "Camila", "Martina", "Paula", "Julia", "Elena", "Carmen",
+    "Mateo", "Santiago", "Lucas", "Diego", "Martín", "Pablo", "Javier", "Tomás", "Andrés", "Gabriel",
+]
+TITLES = {
+    "físico": ["Masaje de espalda", "Abrazo largo", "Baile en la cocina", "Caminata juntos"],
+    "emocional": ["Carta de amor", "Te escuché sin prisa", "Mensaje de buenos días", "Playlist dedicada"],
+    "práctico": ["Lavé los platos", "Hice las compras", "Preparé la cena", "Arreglé la bicicleta"],
+    "general": ["Desayuno sorpresa", "Cena romántica", "Noche de películas", "Flores sin motivo"],
+}
+CATEGORY_WEIGHTS = {"emocional": 35, "físico": 25, "práctico": 25, "general": 15}
+RATING_WEIGHTS = [2, 3, 10, 30, 55]           # ratings 1..5, skewed towards happy couples
+MOOD_WEIGHTS = {"😢": 5, "😔": 10, "😐": 20, "😊": 35, "🥰": 30}
+COMMENTS = ["¡Me encantó!", "Gracias, amor", "Justo lo que necesitaba", "❤️", None, None, None]
+TIMEZONES = {
+    "America/Argentina/Buenos_Aires": 30, "America/Mexico_City": 25, "Europe/Madrid": 20,
+    "America/Bogota": 15, "America/Santiago": 10,
+}
+SYNTHETIC_PASSWORD = "Synthetic123!"
+INSERT_BATCH = 5000
+
+# Populated per worker process by init_worker
+mongo_db = None
+ACHIEVEMENT_RULES = []
+streak_fields = None
+
+
+def init_worker(mongo_url: str, db_name: str):
+    global mongo_db, ACHIEVEMENT_RULES, streak_fields
+    os.environ["MONGO_URL"] = mongo_url
+    os.environ["DB_NAME"] = db_name
+    sys.path.insert(0, str(BACKEND_DIR))
+    from server import ACHIEVEMENT_RULES as rules
+    from migrations import streak_fields as streaks
+    ACHIEVEMENT_RULES = rules
+    streak_fields = streaks
+    mongo_db = MongoClient(mongo_url)[db_name]
+
+
+def seeded_uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """Poisson sample; normal approximation for large means"""
+    if mean <= 0:
+        return 0
+    if mean > 50:
+        return max(0, round(rng.gauss(mean, math.sqrt(mean))))
+    limit, k, p = math.exp(-mean), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def partner_code(number: int) -> str:
+    """6-character code derived from the user number, so it is unique across the dataset"""
+    alphabet = string.digits + string.ascii_uppercase
+    code = ""
+    for _ in range(6):
+        number, digit = divmod(number, 36)
+        code = alphabet[digit] + code
+    return code
+
+
+def make_user(rng: random.Random, number: int, password_hash: str, now: datetime, days: int) -> dict:
+    created_at = now - timedelta(days=days, seconds=rng.randrange(86400 * 30))
+    return {
+        "id": seeded_uuid(rng),
+        "name": f"{rng.choice(FIRST_NAMES)} {number}",
+        "email": f"user{number}@synthetic.loveacts.dev",
+        "password_hash": password_hash,
+        "partner_code": partner_code(number),
+        "partner_id": None,
+        "partner": None,
+        "timezone": weighted(rng, TIMEZONES),
+        "created_at": created_at,
+    }
+
+
+def generate_couple(rng: random.Random, couple_number: int, password_hash: str, now: datetime, days: int):
+    """Two linked users with their full history; returns {collection: [docs]}"""
+    user_a = make_user(rng, couple_number * 2, password_hash, now, days)
+    user_b = make_user(rng, couple_number * 2 + 1, password_hash, now, days)
+    user_b["timezone"] = user_a["timezone"]
+    user_a["partner_id"], user_b["partner_id"] = user_b["id"], user_a["id"]
+
+    linked_at = now - timedelta(days=rng.randint(1, days), seconds=rng.randrange(86400))
+    history_seconds = int((now - linked_at).total_seconds())
+    docs = {"users": [user_a, user_b], "couples": [{
+        "id": seeded_uuid(rng), "code": user_b["partner_code"],
+        "user1_id": user_a["id"], "user2_id": user_b["id"], "created_at": linked_at,
+    }], "activities": [], "moods": [], "achievements": [], "user_counters": []}
+    counters = {
+        user["id"]: {"activities_given": 0, "five_star_ratings": 0, "mood_days": 0, "partners_linked": 1,
+                     "pending_count": 0}
+        for user in (user_a, user_b)
+    }
+    active_days = {user["id"]: set() for user in (user_a, user_b)}
+
+    for giver, receiver in ((user_a, user_b), (user_b, user_a)):
+        # Activity rate per user is long-tailed: most log a few a week, some daily
+        daily_rate = min(3.0, rng.lognormvariate(math.log(0.35), 0.7))
+        count = poisson(rng, daily_rate * history_seconds / 86400)
+        for _ in range(count):
+            created_at = linked_at + timedelta(seconds=rng.randrange(max(1, history_seconds)))
+            category = weighted(rng, CATEGORY_WEIGHTS)
+            activity = {
+                "id": seeded_uuid(rng),
+                "title": rng.choice(TITLES[category]),
+                "description": "Actividad generada",
+                "category": category,
+                "giver_id": giver["id"],
+                "receiver_id": receiver["id"],
+                "rating": None,
+                "comment": None,
+                "created_at": created_at,
+                "rated_at": None,
+                "updated_at": created_at,
+            }
+            # Older activities are almost always rated; recent ones are often pending
+            age_days = (now - created_at).total_seconds() / 86400
+            if rng.random() < (0.95 if age_days > 3 else 0.4):
+                rated_at = min(now, created_at + timedelta(minutes=rng.expovariate(1 / 600)))
+                activity.update(
+                    rating=rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                    comment=rng.choice(COMMENTS),
+                    rated_at=rated_at,
+                    updated_at=rated_at,
+                )
+            docs["activities"].append(activity)
+            counters[giver["id"]]["activities_given"] += 1
+            active_days[giver["id"]].add(
+                created_at.replace(tzinfo=ZoneInfo("UTC")).astimezone(ZoneInfo(giver["timezone"])).date().isoformat()
+            )
+            if activity["rating"] is None:
+                counters[receiver["id"]]["pending_count"] += 1
+            if activity["rating"] == 5:
+                counters[giver["id"]]["five_star_ratings"] += 1
+
+    for user in (user_a, user_b):
+        # Daily mood cadence: each user checks in on a personal fraction of days
+        diligence = rng.betavariate(2, 1.5)
+        zone = ZoneInfo(user["timezone"])
+        for day_offset in range(history_seconds // 86400 + 1):
+            if rng.random() >= diligence:
+                continue
+            date = linked_at + timedelta(days=day_offset, seconds=rng.randrange(86400))
+            if date > now:
+                break
+            docs["moods"].append({
+                "id": seeded_uuid(rng),
+                "user_id": user["id"],
+                "mood_emoji": weighted(rng, MOOD_WEIGHTS),
+                "note": None,
+                "date": date,
+                "day": date.replace(tzinfo=ZoneInfo("UTC")).astimezone(zone).date().isoformat(),
+                "updated_at": date,
+            })
+        # Keep one mood per local day, as the unique (user_id, day) index requires
+        by_day = {mood["day"]: mood for mood in docs["moods"] if mood["user_id"] == user["id"]}
+        docs["moods"] = [mood for mood in docs["moods"] if mood["user_id"] != user["id"]] + list(by_day.values())
+        counters[user["id"]]["mood_days"] = len(by_day)
+        active_days[user["id"]].update(by_day)
+
+    # Each user carries a snapshot of their partner's latest mood
+    for user, partner in ((user_a, user_b), (user_b, user_a)):
+        moods = [mood for mood in docs["moods"] if mood["user_id"] == partner["id"]]
+        latest = max(moods, key=lambda mood: mood["date"], default=None)
+        user["partner"] = {
+            "id": partner["id"],
+            "name": partner["name"],
+            "timezone": partner["timezone"],
+            "latest_mood": latest["mood_emoji"] if latest else None,
+            "mood_note": latest["note"] if latest else None,
+            "mood_date": latest["date"] if latest else None,
+        }
+
+    for user_id, values in counters.items():
+        unlocked = []
+        for rule in ACHIEVEMENT_RULES:
+            if values.get(rule.counter, 0) >= rule.threshold:
+                unlocked.append(rule.achievement_type.value)
+                unlocked_at = linked_at + timedelta(seconds=rng.randrange(max(1, history_seconds)))
+                docs["achievements"].append({
+                    "id": seeded_uuid(rng),
+                    "user_id": user_id,
+                    "achievement_type": rule.achievement_type.value,
+                    "title": rule.title,
+                    "description": rule.description,
+                    "unlocked_at": unlocked_at,
+                    "updated_at": unlocked_at,
+                })
+        docs["user_counters"].append({
+            "user_id": user_id, **values, **streak_fields(sorted(active_days[user_id])), "unlocked": unlocked
+        })
+    return docs
+
+
+def insert_batched(collection, docs: list):
+    for start in range(0, len(docs), INSERT_BATCH):
+        collection.insert_many(docs[start:start + INSERT_BATCH], ordered=False)
+
+
+def run_chunk(task) -> tuple:
+    """Generate and write one chunk of couples; safe to rerun after a partial write"""
+    chunk, config = task
+    started = time.perf_counter()
+    rng = random.Random(f"{config['seed']}-{chunk}")
+    first = chunk * config["chunk_size"]
+    last = min(config["couples"], first + config["chunk_size"])
+    now = datetime.fromisoformat(config["now"])
+
+    docs = {}
+    for couple_number in range(first, last):
+        for name, items in generate_couple(rng, couple_number, config["password_hash"], now, config["days"]).items():
+            docs.setdefault(name, []).extend(items)
+
+    # Clear anything a crashed earlier attempt wrote for this chunk (ids are deterministic)
+    user_ids = [user["id"] for user in docs["users"]]
+    mongo_db.users.delete_many({"id": {"$in": user_ids}})
+    mongo_db.couples.delete_many({"user1_id": {"$in": user_ids}})
+    mongo_db.activities.delete_many({"giver_id": {"$in": user_ids}})
+    for name in ("moods", "achievements", "user_counters"):
+        mongo_db[name].delete_many({"user_id": {"$in": user_ids}})
+
+    for name, items in docs.items():
+        insert_batched(mongo_db[name], items)
+    mongo_db._generator_progress.insert_one({"_id": chunk, "finished_at": datetime.utcnow()})
+    return chunk, {name: len(items) for name, items in docs.items()}, time.perf_counter() - started
+
+
+def load_config(db, args) -> dict:
+    """The stored run config wins on resume, so every chunk shares one `now` and password hash"""
+    stored = db._generator_config.find_one({"_id": "config"})
+    requested = {"seed": args.seed, "couples": args.couples, "chunk_size": args.chunk_size, "days": args.days}
+    if stored:
+        mismatched = {key: (stored[key], value) for key, value in requested.items() if stored[key] != value}
+        if mismatched:
+            sys.exit(f"❌ Existing dataset was generated with different settings {mismatched}; "
+                     f"rerun with matching flags or --reset")
+        return stored
+    config = {
+        "_id": "config",
+        **requested,
+        "now": datetime.utcnow().replace(microsecond=0).isoformat(),
+        "password_hash": bcrypt.hashpw(SYNTHETIC_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8"),
+    }
+    db._generator_config.insert_one(dict(config))
+    return config
+
+
+def main(args):
+    print("🚀 LoveActs V2.0 Synthetic Data Generator")
+    print("=" * 60)
+    client = MongoClient(args.mongo_url)
+    db = client[args.db_name]
+    if args.reset:
+        client.drop_database(args.db_name)
+        print(f"🗑️  Dropped {args.db_name}")
+
+    config = load_config(db, args)
+    config.pop("_id")
+    chunks = math.ceil(args.couples / args.chunk_size)
+    done = {row["_id"] for row in db._generator_progress.find({}, {"_id": 1})}
+    pending = [(chunk, config) for chunk in range(chunks) if chunk not in done]
+    print(f"📋 {args.couples:,} couples in {chunks} chunks, seed {args.seed}: "
+          f"{len(done)} already done, {len(pending)} to go with {args.workers} workers")
+
+    totals = {}
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(
+        args.workers, initializer=init_worker, initargs=(args.mongo_url, args.db_name)
+    ) as pool:
+        for index, (chunk, counts, seconds) in enumerate(pool.imap_unordered(run_chunk, pending), start=1):
+            for name, count in counts.items():
+                totals[name] = totals.get(name, 0) + count
+            print(f"   chunk {chunk:5d} done in {seconds:6.1f}s ({index}/{len(pending)})  "
+                  + "  ".join(f"{name} {count:,}" for name, count in counts.items()))
+
+    elapsed = time.perf_counter() - started
+    print(f"\n🏁 Generated in {elapsed:.1f}s: " + ", ".join(f"{name} {count:,}" for name, count in totals.items()))
+
+    if not args.skip_indexes:
+        # Building indexes once after the bulk load is much cheaper than maintaining them during it
+        os.environ["MONGO_URL"] = args.mongo_url
+        os.environ["DB_NAME"] = args.db_name
+        sys.path.insert(0, str(BACKEND_DIR))
+        import server
+        print("📋 Building indexes")
+        asyncio.run(server.setup_indexes())
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="loveacts_synthetic")
+    parser.add_argument("--couples", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=730, help="maximum relationship history in days")
+    parser.add_argument("--chunk-size", type=int, default=250, help="couples per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop the database and start over")
+    parser.add_argument("--skip-indexes", action="store_true", help="do not build the API indexes afterwards")
+    main(parser.parse_args())
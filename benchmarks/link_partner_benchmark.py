@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+LoveActs V2.0 Partner Linking Benchmark
+Compares the batched, transactional link_partner against the original
+seven-await flow on a scratch database, then races concurrent links to the
+same partner code through each implementation and counts inconsistent
+outcomes (more than one couple, or users left half-linked).
+
+Usage:
+    python benchmarks/link_partner_benchmark.py [--runs 200] [--race-size 8]
+
+MONGO_URL is read from the environment (or backend/.env). The benchmark
+writes to BENCH_DB_NAME (default: loveacts_bench) and drops it afterwards.
+Transactions are only used when MONGO_URL points at a replica set or a
+sharded cluster; the mode in use is printed.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from fastapi import HTTPException
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "loveacts_bench")
+
+import server  # noqa: E402
+from server import db, Achievement, AchievementType, Couple, CoupleCreate, User  # noqa: E402
+
+
+async def legacy_link_partner(couple_data: CoupleCreate, current_user: User):
+    """Original implementation: up to seven sequential, unguarded round trips"""
+    if current_user.partner_id:
+        raise HTTPException(status_code=400, detail="Already have a partner")
+    partner = await db.users.find_one({"partner_code": couple_data.code})
+    if not partner:
+        raise HTTPException(status_code=404, detail="Invalid partner code")
+    if partner["id"] == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot link to yourself")
+    if partner.get("partner_id"):
+        raise HTTPException(status_code=400, detail="Partner already linked to someone else")
+
+    couple = Couple(code=couple_data.code, user1_id=current_user.id, user2_id=partner["id"])
+    await db.couples.insert_one(couple.dict())
+    await db.users.update_one({"id": current_user.id}, {"$set": {"partner_id": partner["id"]}})
+    await db.users.update_one({"id": partner["id"]}, {"$set": {"partner_id": current_user.id}})
+    for user_id in [current_user.id, partner["id"]]:
+        existing = await db.achievements.find_one({
+            "user_id": user_id,
+            "achievement_type": AchievementType.PARTNER_LINKED
+        })
+        if not existing:
+            achievement = Achievement(
+                user_id=user_id,
+                achievement_type=AchievementType.PARTNER_LINKED,
+                title="💕 Corazones Unidos",
+                description="Te vinculaste con tu pareja"
+            )
+            await db.achievements.insert_one(achievement.dict())
+    return {"message": "Partner linked successfully"}
+
+
+def new_user(label: str) -> User:
+    return User(
+        name=label,
+        email=f"{uuid.uuid4().hex}@bench.loveacts.dev",
+        password_hash="x",
+        partner_code=uuid.uuid4().hex[:8].upper()
+    )
+
+
+async def seed_users(count: int):
+    users = [new_user(f"Bench {i}") for i in range(count)]
+    await db.users.insert_many([user.dict() for user in users])
+    return users
+
+
+async def reset():
+    for name in ("users", "couples", "achievements", "user_counters", "moods"):
+        await db[name].drop()
+    await server.setup_indexes()
+
+
+async def time_links(func, runs: int):
+    users = await seed_users(runs * 2)
+    timings = []
+    for i in range(runs):
+        me, partner = users[2 * i], users[2 * i + 1]
+        start = time.perf_counter()
+        await func(CoupleCreate(code=partner.partner_code), current_user=me)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def race(func, size: int):
+    """`size` users link to the same partner code at once; returns (linked, inconsistent)"""
+    users = await seed_users(size + 1)
+    target, suitors = users[0], users[1:]
+    outcomes = await asyncio.gather(
+        *(func(CoupleCreate(code=target.partner_code), current_user=user) for user in suitors),
+        return_exceptions=True
+    )
+    linked = sum(1 for outcome in outcomes if not isinstance(outcome, Exception))
+    couples = await db.couples.count_documents({"code": target.partner_code})
+    target_doc = await db.users.find_one({"id": target.id})
+    claimed = await db.users.count_documents({"id": {"$in": [u.id for u in suitors]}, "partner_id": target.id})
+    consistent = couples <= 1 and claimed == couples and (target_doc["partner_id"] is not None) == (couples == 1)
+    return linked, not consistent
+
+
+def describe(label: str, timings):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"   {label:<12} mean {statistics.mean(timings):8.2f} ms   "
+          f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+    return statistics.median(timings)
+
+
+async def main(runs: int, race_size: int, races: int):
+    print("🚀 LoveActs V2.0 Partner Linking Benchmark")
+    print("=" * 60)
+    try:
+        await reset()
+        await server.detect_deployment()
+        mode = "transaction" if server.deployment["transactions"] else "guarded batch (standalone server)"
+        print(f"\n📋 {runs} links per implementation, new flow uses: {mode}")
+
+        legacy_timings = await time_links(legacy_link_partner, runs)
+        new_timings = await time_links(server.link_partner, runs)
+        legacy_p50 = describe("legacy", legacy_timings)
+        new_p50 = describe("batched", new_timings)
+        print(f"   Speedup (p50): {legacy_p50 / new_p50:.1f}x")
+
+        print(f"\n📋 {races} races of {race_size} concurrent links to one partner code")
+        for label, func in (("legacy", legacy_link_partner), ("batched", server.link_partner)):
+            inconsistent = 0
+            for _ in range(races):
+                _, broken = await race(func, race_size)
+                inconsistent += broken
+            print(f"   {label:<12} inconsistent outcomes: {inconsistent}/{races}")
+    finally:
+        await server.client.drop_database(os.environ["DB_NAME"])
+        server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--race-size", type=int, default=8)
+    parser.add_argument("--races", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.race_size, args.races))
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+LoveActs V2.0 Load Test Suite
+Starts backend/server.py under uvicorn against a local mongod, seeds
+realistic couples through the API and drives concurrent async clients at
+every api_router route. Per-endpoint RPS and latency percentiles are
+written as JSON, so runs can be diffed across commits.
+
+Usage:
+    python benchmarks/loadtest.py [--couples 20] [--duration 5] [--concurrency 20]
+                                  [--only "GET /api/dashboard/stats" ...]
+                                  [--output benchmarks/results/<commit>.json]
+
+The target database (LOADTEST_DB_NAME, default: loveacts_loadtest) is
+dropped before seeding and after the run.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+from pymongo import MongoClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# The spawned server serves its operational endpoints to this token only
+INTERNAL_TOKEN = uuid.uuid4().hex
+
+CATEGORIES = ["físico", "emocional", "práctico", "general"]
+MOODS = ["😢", "😔", "😐", "😊", "🥰"]
+TITLES = [
+    "Desayuno sorpresa", "Masaje de espalda", "Carta de amor", "Lavé los platos",
+    "Paseo al atardecer", "Cena romántica", "Abrazo largo", "Hice las compras",
+]
+
+
+class ScenarioExhausted(Exception):
+    """Raised by a scenario when it has no more one-shot fixtures to consume"""
+
+
+class LoadTestContext:
+    """Seeded users and the pools that one-shot scenarios consume"""
+
+    def __init__(self):
+        self.couples = []          # [(user_a, user_b)], each user: {"id", "token", "email", "password"}
+        self.pending = deque()     # (receiver token, activity id) waiting for a rating
+        self.unlinked_pairs = deque()  # (token, partner code) for link-partner
+        self.counter = itertools.count()
+
+    def random_user(self):
+        return random.choice(random.choice(self.couples))
+
+    def auth(self, user) -> dict:
+        return {"Authorization": f"Bearer {user['token']}"}
+
+
+# Scenarios: one per api_router route, keyed "METHOD /api/path"
+async def register(client, ctx):
+    n = next(ctx.counter)
+    return await client.post("/auth/register", json={
+        "name": f"Carga {n}", "email": f"load-{uuid.uuid4().hex[:12]}@example.com", "password": "LoadTest123!"
+    })
+
+
+async def login(client, ctx):
+    user = ctx.random_user()
+    return await client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+
+
+async def link_partner(client, ctx):
+    if not ctx.unlinked_pairs:
+        raise ScenarioExhausted
+    token, code = ctx.unlinked_pairs.popleft()
+    return await client.post("/couples/link-partner", json={"code": code},
+                             headers={"Authorization": f"Bearer {token}"})
+
+
+async def create_activity(client, ctx):
+    user_a, user_b = random.choice(ctx.couples)
+    giver, receiver = random.choice([(user_a, user_b), (user_b, user_a)])
+    return await client.post("/activities/create", headers=ctx.auth(giver), json={
+        "title": random.choice(TITLES), "description": "Generada por la prueba de carga",
+        "category": random.choice(CATEGORIES), "receiver_id": receiver["id"]
+    })
+
+
+async def rate_activity(client, ctx):
+    if not ctx.pending:
+        raise ScenarioExhausted
+    token, activity_id = ctx.pending.popleft()
+    return await client.post(f"/activities/{activity_id}/rate", headers={"Authorization": f"Bearer {token}"},
+                             json={"rating": random.randint(3, 5), "comment": "¡Gracias!"})
+
+
+async def create_mood(client, ctx):
+    return await client.post("/moods/create", headers=ctx.auth(ctx.random_user()),
+                             json={"mood_emoji": random.choice(MOODS), "note": "Prueba de carga"})
+
+
+async def sync_push(client, ctx):
+    n = next(ctx.counter)
+    return await client.post("/sync/push", headers=ctx.auth(ctx.random_user()), json={
+        "activities": [{
+            "client_key": f"load-{n}-{i}", "title": random.choice(TITLES),
+            "description": "Sincronizada sin conexión", "category": random.choice(CATEGORIES)
+        } for i in range(5)],
+        "moods": [{"client_key": f"load-mood-{n}", "mood_emoji": random.choice(MOODS)}]
+    })
+
+
+def authed_get(path: str):
+    async def scenario(client, ctx):
+        return await client.get(path, headers=ctx.auth(ctx.random_user()))
+    return scenario
+
+
+def public_get(path: str):
+    async def scenario(client, ctx):
+        return await client.get(path)
+    return scenario
+
+
+def internal_get(path: str):
+    async def scenario(client, ctx):
+        return await client.get(path, headers={"Authorization": f"Bearer {INTERNAL_TOKEN}"})
+    return scenario
+
+
+SCENARIOS = {
+    "GET /api/": public_get("/"),
+    "GET /api/internal/stats": internal_get("/internal/stats"),
+    "GET /api/internal/indexes": internal_get("/internal/indexes"),
+    "GET /api/internal/slow-queries": internal_get("/internal/slow-queries"),
+    "POST /api/auth/register": register,
+    "POST /api/auth/login": login,
+    "GET /api/auth/me": authed_get("/auth/me"),
+    "POST /api/couples/link-partner": link_partner,
+    "GET /api/couples/my-partner": authed_get("/couples/my-partner"),
+    "POST /api/activities/create": create_activity,
+    "GET /api/activities/my-activities": authed_get("/activities/my-activities"),
+    "GET /api/activities/partner-activities": authed_get("/activities/partner-activities"),
+    "POST /api/activities/{activity_id}/rate": rate_activity,
+    "GET /api/activities/pending-ratings": authed_get("/activities/pending-ratings"),
+    "GET /api/activities/pending-count": authed_get("/activities/pending-count"),
+    "GET /api/activities/special-memories": authed_get("/activities/special-memories"),
+    "POST /api/moods/create": create_mood,
+    "GET /api/moods/my-moods": authed_get("/moods/my-moods"),
+    "GET /api/moods/partner-mood": authed_get("/moods/partner-mood"),
+    "GET /api/achievements/my-achievements": authed_get("/achievements/my-achievements"),
+    "GET /api/achievements/check-new": authed_get("/achievements/check-new"),
+    "GET /api/sync": authed_get("/sync"),
+    "POST /api/sync/push": sync_push,
+    "GET /api/dashboard/stats": authed_get("/dashboard/stats"),
+    "GET /api/home": authed_get("/home"),
+}
+
+
+async def register_user(client, name: str) -> dict:
+    credentials = {"email": f"seed-{uuid.uuid4().hex[:12]}@example.com", "password": "LoadTest123!"}
+    response = await client.post("/auth/register", json={"name": name, **credentials})
+    response.raise_for_status()
+    data = response.json()
+    return {"id": data["user"]["id"], "token": data["access_token"],
+            "partner_code": data["user"]["partner_code"], **credentials}
+
+
+async def seed(client, ctx: LoadTestContext, couples: int, activities_per_user: int, pool_size: int):
+    """Create linked couples with history, plus pools for one-shot scenarios"""
+    semaphore = asyncio.Semaphore(20)
+
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    async def seed_couple(index: int):
+        user_a = await register_user(client, f"Pareja {index} A")
+        user_b = await register_user(client, f"Pareja {index} B")
+        response = await client.post("/couples/link-partner", json={"code": user_b["partner_code"]},
+                                     headers=ctx.auth(user_a))
+        response.raise_for_status()
+        for giver, receiver in ((user_a, user_b), (user_b, user_a)):
+            for _ in range(activities_per_user):
+                response = await create_activity_for(client, ctx, giver, receiver)
+                activity_id = response.json()["activity_id"]
+                # Most activities get rated; ~15% stay pending
+                if random.random() < 0.85:
+                    await client.post(f"/activities/{activity_id}/rate", headers=ctx.auth(receiver), json={
+                        "rating": random.choices([1, 2, 3, 4, 5], weights=[2, 3, 10, 30, 55])[0]
+                    })
+                else:
+                    ctx.pending.append((receiver["token"], activity_id))
+            await client.post("/moods/create", headers=ctx.auth(giver), json={"mood_emoji": random.choice(MOODS)})
+        ctx.couples.append((user_a, user_b))
+
+    async def seed_unlinked_pair(index: int):
+        user_a = await register_user(client, f"Suelto {index} A")
+        user_b = await register_user(client, f"Suelto {index} B")
+        ctx.unlinked_pairs.append((user_a["token"], user_b["partner_code"]))
+
+    await asyncio.gather(*(limited(seed_couple(i)) for i in range(couples)))
+    await asyncio.gather(*(limited(seed_unlinked_pair(i)) for i in range(pool_size)))
+
+    # Extra pending activities so the rating scenario has enough to consume
+    for _ in range(pool_size):
+        user_a, user_b = random.choice(ctx.couples)
+        response = await create_activity_for(client, ctx, user_a, user_b)
+        ctx.pending.append((user_b["token"], response.json()["activity_id"]))
+
+
+async def create_activity_for(client, ctx, giver, receiver):
+    response = await client.post("/activities/create", headers=ctx.auth(giver), json={
+        "title": random.choice(TITLES), "description": "Historial sembrado",
+        "category": random.choice(CATEGORIES), "receiver_id": receiver["id"]
+    })
+    response.raise_for_status()
+    return response
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def drive(client, ctx, scenario, duration: float, concurrency: int) -> dict:
+    """Run `concurrency` workers against one scenario for `duration` seconds"""
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+            except ScenarioExhausted:
+                return
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    if not latencies:
+        return {"requests": 0, "errors": errors, "statuses": statuses}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": dict(sorted(statuses.items())),
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def start_server(mongo_url: str, db_name: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "MONGO_URL": mongo_url, "DB_NAME": db_name, "INTERNAL_API_TOKEN": INTERNAL_TOKEN}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def wait_until_ready(client, server: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("server did not become ready")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(args):
+    print("🚀 LoveActs V2.0 Load Test Suite")
+    print("=" * 60)
+    # Start from an empty database: the server builds its indexes at startup
+    mongo = MongoClient(args.mongo_url)
+    mongo.drop_database(args.db_name)
+    server = start_server(args.mongo_url, args.db_name, args.port)
+    limits = httpx.Limits(max_connections=args.concurrency + 20)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}/api", timeout=30, limits=limits) as client:
+            await wait_until_ready(client, server)
+
+            spec = (await client.get(f"http://127.0.0.1:{args.port}/openapi.json")).json()
+            routes = {
+                f"{method.upper()} {path}"
+                for path, operations in spec["paths"].items() if path.startswith("/api")
+                for method in operations
+            }
+            uncovered = sorted(routes - set(SCENARIOS))
+            if uncovered:
+                print(f"⚠️  Routes without a scenario: {', '.join(uncovered)}")
+
+            selected = [name for name in SCENARIOS if not args.only or name in args.only]
+            print(f"\n📋 Seeding {args.couples} couples, {args.activities} activities per user")
+            ctx = LoadTestContext()
+            await seed(client, ctx, args.couples, args.activities, args.pool)
+
+            results = {}
+            for name in selected:
+                results[name] = await drive(client, ctx, SCENARIOS[name], args.duration, args.concurrency)
+                row = results[name]
+                if row["requests"]:
+                    print(f"   {name:<44} {row['rps']:8.1f} rps   p50 {row['p50_ms']:7.2f}   "
+                          f"p95 {row['p95_ms']:7.2f}   p99 {row['p99_ms']:7.2f} ms   errors {row['errors']}")
+                else:
+                    print(f"   {name:<44} no requests completed   statuses {row['statuses']}")
+    finally:
+        server.terminate()
+        server.wait()
+        mongo.drop_database(args.db_name)
+        mongo.close()
+
+    commit = git_commit()
+    output = Path(args.output) if args.output else RESULTS_DIR / f"loadtest-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "config": {
+            "couples": args.couples, "activities_per_user": args.activities,
+            "duration_seconds": args.duration, "concurrency": args.concurrency,
+        },
+        "uncovered_routes": uncovered,
+        "endpoints": results,
+    }
+    output.write_text(json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False) + "\n")
+    print(f"\n🏁 Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=os.environ.get("LOADTEST_DB_NAME", "loveacts_loadtest"))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--couples", type=int, default=20)
+    parser.add_argument("--activities", type=int, default=30, help="seeded activities given per user")
+    parser.add_argument("--pool", type=int, default=200,
+                        help="fixtures seeded for one-shot scenarios (link-partner, rate)")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--only", nargs="+", help="scenario names to run, e.g. \"GET /api/home\"")
+    parser.add_argument("--output", help="JSON results path")
+    asyncio.run(main(parser.parse_args()))
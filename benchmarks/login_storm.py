@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+LoveActs V2.0 Login Storm Load Test
+Measures /api/auth/me latency on its own and while a storm of concurrent
+logins hammers bcrypt. With password work offloaded to the bounded pool,
+p99 for /auth/me should stay close to its baseline.
+
+Usage:
+    python benchmarks/login_storm.py [--base-url http://localhost:8001/api]
+                                     [--duration 10] [--login-concurrency 50]
+
+The password pool stats are read from /api/internal/stats when
+INTERNAL_API_TOKEN (or --internal-token) matches the server's.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def poll_me(client: httpx.AsyncClient, token: str, stop: asyncio.Event, concurrency: int):
+    """Hit /auth/me continuously from `concurrency` workers until stopped"""
+    latencies = []
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def worker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = await client.get("/auth/me", headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def login_storm(client: httpx.AsyncClient, credentials: dict, stop: asyncio.Event, concurrency: int):
+    """Fire logins from `concurrency` workers until stopped"""
+    outcomes = {"ok": 0, "shed": 0, "failed": 0}
+
+    async def worker():
+        while not stop.is_set():
+            response = await client.post("/auth/login", json=credentials)
+            if response.status_code == 200:
+                outcomes["ok"] += 1
+            elif response.status_code == 503:
+                outcomes["shed"] += 1
+            else:
+                outcomes["failed"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return outcomes
+
+
+async def run_phase(client, token, credentials, duration: float, me_concurrency: int, login_concurrency: int):
+    stop = asyncio.Event()
+    poller = asyncio.create_task(poll_me(client, token, stop, me_concurrency))
+    storm = None
+    if login_concurrency:
+        storm = asyncio.create_task(login_storm(client, credentials, stop, login_concurrency))
+    await asyncio.sleep(duration)
+    stop.set()
+    latencies = await poller
+    outcomes = await storm if storm else None
+    return latencies, outcomes
+
+
+def report(label: str, latencies, outcomes=None):
+    print(f"   {label:<10} requests {len(latencies):6d}   "
+          f"p50 {statistics.median(latencies):7.2f} ms   "
+          f"p95 {percentile(latencies, 95):7.2f} ms   "
+          f"p99 {percentile(latencies, 99):7.2f} ms")
+    if outcomes:
+        print(f"   {'':<10} logins ok {outcomes['ok']}, shed (503) {outcomes['shed']}, failed {outcomes['failed']}")
+
+
+async def main(args):
+    print("🚀 LoveActs V2.0 Login Storm Load Test")
+    print("=" * 60)
+    limits = httpx.Limits(max_connections=args.me_concurrency + args.login_concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        credentials = {"email": f"storm-{uuid.uuid4().hex[:10]}@example.com", "password": "StormPassword123!"}
+        response = await client.post("/auth/register", json={"name": "Storm Tester", **credentials})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+        print(f"\n📋 Baseline: /auth/me for {args.duration:.0f}s")
+        baseline, _ = await run_phase(client, token, credentials, args.duration, args.me_concurrency, 0)
+        report("baseline", baseline)
+
+        print(f"\n📋 Storm: /auth/me with {args.login_concurrency} concurrent logins for {args.duration:.0f}s")
+        storm, outcomes = await run_phase(
+            client, token, credentials, args.duration, args.me_concurrency, args.login_concurrency
+        )
+        report("storm", storm, outcomes)
+
+        stats = None
+        if args.internal_token:
+            response = await client.get("/internal/stats", headers={"Authorization": f"Bearer {args.internal_token}"})
+            stats = response.json().get("password_pool") if response.status_code == 200 else None
+        if stats:
+            print(f"\n   Password pool after storm: {stats}")
+
+        ratio = percentile(storm, 99) / percentile(baseline, 99)
+        print(f"\n   p99 storm/baseline: {ratio:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001/api")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--me-concurrency", type=int, default=10)
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--internal-token", default=os.environ.get("INTERNAL_API_TOKEN", ""))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+LoveActs V2.0 Serialization Microbenchmark
+Per-document cost of turning Motor results into a JSON response body, before
+and after projection pushdown:
+
+  legacy      fetch with _id, serialize_doc() walk, jsonable_encoder, json.dumps
+  encoder     _id excluded by the query, jsonable_encoder, json.dumps
+  orjson      _id excluded by the query, rendered directly by orjson
+  sparse      ?fields=title,rating,created_at, rendered by orjson
+
+Documents are built in memory with the shapes Motor returns (ObjectId,
+naive UTC datetimes), so no database is needed.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--docs 20 100 1000] [--runs 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "loveacts_bench")
+
+from server import dump_json  # noqa: E402
+
+CATEGORIES = ["físico", "emocional", "práctico", "general"]
+SPARSE_FIELDS = ("id", "title", "rating", "created_at")
+
+
+def serialize_doc(doc):
+    """The helper list endpoints used to run over every result"""
+    if doc is None:
+        return None
+    if isinstance(doc, list):
+        return [serialize_doc(item) for item in doc]
+    if isinstance(doc, dict):
+        result = {}
+        for key, value in doc.items():
+            if key == "_id":
+                continue
+            result[key] = serialize_doc(value)
+        return result
+    return doc
+
+
+def make_activity(now: datetime) -> dict:
+    created_at = now - timedelta(minutes=random.randrange(100_000))
+    rated = random.random() < 0.9
+    return {
+        "_id": ObjectId(),
+        "id": str(uuid.uuid4()),
+        "title": "Preparé la cena",
+        "description": "Actividad generada para el benchmark",
+        "category": random.choice(CATEGORIES),
+        "giver_id": str(uuid.uuid4()),
+        "receiver_id": str(uuid.uuid4()),
+        "rating": random.randint(1, 5) if rated else None,
+        "comment": "¡Me encantó!" if rated else None,
+        "created_at": created_at,
+        "rated_at": created_at + timedelta(hours=1) if rated else None,
+        "updated_at": created_at + timedelta(hours=1),
+    }
+
+
+def without_id(docs):
+    return [{key: value for key, value in doc.items() if key != "_id"} for doc in docs]
+
+
+STRATEGIES = {
+    "legacy": (lambda docs: docs, lambda docs: json.dumps(jsonable_encoder(serialize_doc(docs))).encode("utf-8")),
+    "encoder": (without_id, lambda docs: json.dumps(jsonable_encoder(docs)).encode("utf-8")),
+    "orjson": (without_id, dump_json),
+    "sparse": (lambda docs: [{key: doc[key] for key in SPARSE_FIELDS} for doc in docs], dump_json),
+}
+
+
+def measure(render, docs, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        body = render(docs)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(body)
+
+
+def main(sizes, runs: int):
+    print("🚀 LoveActs V2.0 Serialization Microbenchmark")
+    print("=" * 60)
+    now = datetime.utcnow()
+    for size in sizes:
+        fetched = [make_activity(now) for _ in range(size)]
+        print(f"\n📋 {size:,} activities per response")
+        baseline = None
+        for label, (shape, render) in STRATEGIES.items():
+            # The projection runs in Mongo, so shaping the input is not timed
+            median, size_bytes = measure(render, shape(fetched), runs)
+            per_doc_us = median / size * 1e6
+            baseline = baseline or per_doc_us
+            print(f"   {label:<8} {per_doc_us:8.2f} µs/doc   {size_bytes / size:7.0f} B/doc   "
+                  f"{baseline / per_doc_us:5.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    main(args.docs, args.runs)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+LoveActs V2.0 Wire Format Benchmark
+Bytes on the wire and server CPU per response for the list endpoints, for
+every format the API negotiates: JSON or MessagePack, each uncompressed,
+gzip and brotli. Bodies are rendered and compressed with the same code the
+API uses (server.dump_body and negotiation.compress) on in-memory documents,
+so no database is needed.
+
+Usage:
+    python benchmarks/wire_format_benchmark.py [--runs 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "loveacts_bench")
+
+from negotiation import brotli, compress, msgpack, response_format, JSON, MSGPACK  # noqa: E402
+from server import dump_body  # noqa: E402
+from serialization_benchmark import make_activity  # noqa: E402
+
+MOODS = ["😢", "😔", "😐", "😊", "🥰"]
+
+
+def make_mood(now: datetime, day: int) -> dict:
+    date = now - timedelta(days=day, minutes=random.randrange(1440))
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "mood_emoji": random.choice(MOODS),
+        "note": "Un buen día" if random.random() < 0.3 else None,
+        "date": date,
+        "day": date.date().isoformat(),
+        "updated_at": date,
+    }
+
+
+def strip_id(doc: dict) -> dict:
+    return {key: value for key, value in doc.items() if key != "_id"}
+
+
+def payloads(now: datetime) -> dict:
+    activities = [strip_id(make_activity(now)) for _ in range(1000)]
+    return {
+        "activities, page of 20": {"items": activities[:20], "next_cursor": "eyJ0cyI6IDB9"},
+        "activities, page of 100": {"items": activities[:100], "next_cursor": "eyJ0cyI6IDB9"},
+        "activities, legacy list of 1000": activities,
+        "my-moods, legacy list of 30": [make_mood(now, day) for day in range(30)],
+    }
+
+
+def formats():
+    for body_format in (JSON, MSGPACK):
+        if body_format == MSGPACK and msgpack is None:
+            continue
+        for encoding in ("identity", "gzip", "br"):
+            if encoding == "br" and brotli is None:
+                continue
+            yield body_format, encoding
+
+
+def measure(content, body_format: str, encoding: str, runs: int):
+    """(bytes on the wire, CPU µs per response) for rendering plus compression"""
+    token = response_format.set(body_format)
+    try:
+        started = time.process_time()
+        for _ in range(runs):
+            body = dump_body(content)
+            if encoding != "identity":
+                body = compress(body, encoding)
+        cpu_us = (time.process_time() - started) / runs * 1e6
+    finally:
+        response_format.reset(token)
+    return len(body), cpu_us
+
+
+def main(runs: int):
+    print("🚀 LoveActs V2.0 Wire Format Benchmark")
+    print("=" * 60)
+    if msgpack is None or brotli is None:
+        print("⚠️  msgpack or Brotli is not installed; those formats are skipped")
+    for label, content in payloads(datetime.utcnow()).items():
+        print(f"\n📋 {label}")
+        baseline = None
+        for body_format, encoding in formats():
+            size, cpu_us = measure(content, body_format, encoding, runs)
+            baseline = baseline or size
+            name = f"{body_format.split('/')[1]}+{encoding}"
+            print(f"   {name:<22} {size:9,} B  {size / baseline:6.1%}   {cpu_us:9.1f} µs CPU")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    main(args.runs)
@@ -2,8 +2,11 @@ import React from 'react';
 import { Tabs } from 'expo-router';
 import { Ionicons } from '@expo/vector-icons';
 import { Colors } from '../../constants/Colors';
+import { useRealtime } from '../../hooks/useRealtime';
 
 export default function TabLayout() {
+  useRealtime();
+
   return (
     <Tabs
       screenOptions={{
@@ -12,7 +12,7 @@ import {
 import { useQuery } from '@tanstack/react-query';
 import { Ionicons } from '@expo/vector-icons';
 import { useAuth } from '../../hooks/useAuth';
-import { dashboardAPI, moodsAPI } from '../../utils/api';
+import { homeAPI, moodsAPI } from '../../utils/api';
 import LoadingScreen from '../../components/LoadingScreen';
 import { MoodEmoji } from '../../types';
 import { Colors } from '../../constants/Colors';
@@ -30,10 +30,12 @@ export default function HomeScreen() {
   const [selectedMood, setSelectedMood] = useState<MoodEmoji | null>(null);
   const [refreshing, setRefreshing] = useState(false);
 
-  const { data: stats, isLoading, refetch } = useQuery({
-    queryKey: ['dashboard-stats'],
-    queryFn: dashboardAPI.getStats,
+  // Shared with the partner tab: one /home round trip serves both
+  const { data: home, isLoading, refetch } = useQuery({
+    queryKey: ['home'],
+    queryFn: homeAPI.get,
   });
+  const stats = home?.stats;
 
   const { data: myMoods } = useQuery({
     queryKey: ['my-moods'],
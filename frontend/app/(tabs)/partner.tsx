@@ -13,7 +13,7 @@ import {
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { Ionicons } from '@expo/vector-icons';
 import { useForm, Controller } from 'react-hook-form';
-import { couplesAPI, activitiesAPI } from '../../utils/api';
+import { homeAPI, activitiesAPI } from '../../utils/api';
 import LoadingScreen from '../../components/LoadingScreen';
 import Button from '../../components/Button';
 import Input from '../../components/Input';
@@ -27,10 +27,11 @@ export default function PartnerScreen() {
 
   const { control, handleSubmit, reset, setValue } = useForm<ActivityRating>();
 
-  const { data: partner, isLoading: partnersLoading } = useQuery({
-    queryKey: ['my-partner'],
-    queryFn: couplesAPI.getMyPartner,
+  const { data: home, isLoading: partnersLoading } = useQuery({
+    queryKey: ['home'],
+    queryFn: homeAPI.get,
   });
+  const partner = home?.partner;
 
   const { data: pendingRatings, isLoading: ratingsLoading } = useQuery({
     queryKey: ['pending-ratings'],
@@ -42,7 +43,7 @@ export default function PartnerScreen() {
       activitiesAPI.rateActivity(activityId, rating),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['pending-ratings'] });
-      queryClient.invalidateQueries({ queryKey: ['dashboard-stats'] });
+      queryClient.invalidateQueries({ queryKey: ['home'] });
       setRatingModalVisible(false);
       setSelectedActivity(null);
       reset();
@@ -70,7 +71,7 @@ export default function PartnerScreen() {
   const onRefresh = async () => {
     setRefreshing(true);
     await Promise.all([
-      queryClient.invalidateQueries({ queryKey: ['my-partner'] }),
+      queryClient.invalidateQueries({ queryKey: ['home'] }),
       queryClient.invalidateQueries({ queryKey: ['pending-ratings'] }),
     ]);
     setRefreshing(false);
@@ -0,0 +1,66 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import * as SecureStore from 'expo-secure-store';
+import { API_URL } from '../utils/api';
+
+// Queries each real-time event makes stale; refetches are cheap thanks to ETags
+const INVALIDATES: Record<string, string[][]> = {
+  mood: [['home'], ['my-moods']],
+  'activity.created': [['pending-ratings'], ['home']],
+  'activity.rated': [['home'], ['special-memories']],
+  'achievement.unlocked': [['my-achievements'], ['home']],
+};
+
+const MAX_RETRY_DELAY = 30000;
+
+// Listens to the couple's event stream instead of polling, reconnecting with backoff
+export function useRealtime() {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let attempts = 0;
+    let stopped = false;
+
+    const connect = async () => {
+      const token = await SecureStore.getItemAsync('auth_token');
+      if (!token || stopped) {
+        return;
+      }
+      // React Native's WebSocket takes headers as its third argument
+      const RNWebSocket = WebSocket as any;
+      socket = new RNWebSocket(`${API_URL.replace(/^http/, 'ws')}/api/events/ws`, null, {
+        headers: { Authorization: `Bearer ${token}` },
+      }) as WebSocket;
+
+      socket.onopen = () => {
+        attempts = 0;
+      };
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.type === 'resync' || event.type === 'sync') {
+          queryClient.invalidateQueries();
+        } else if (event.type === 'partner.linked') {
+          // Reconnecting subscribes to the new partner's events
+          queryClient.invalidateQueries();
+          socket?.close();
+        } else {
+          (INVALIDATES[event.type] || []).forEach((queryKey) => queryClient.invalidateQueries({ queryKey }));
+        }
+      };
+      socket.onclose = () => {
+        if (!stopped) {
+          retry = setTimeout(connect, Math.min(MAX_RETRY_DELAY, 1000 * 2 ** attempts++));
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retry);
+      socket?.close();
+    };
+  }, [queryClient]);
+}
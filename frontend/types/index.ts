@@ -104,6 +104,13 @@ export interface DashboardStats {
   pending_ratings: number;
 }
 
+export interface HomeData {
+  user: User;
+  partner: Partner | null;
+  partner_mood: Mood | null;
+  stats: DashboardStats;
+}
+
 export interface LinkPartnerData {
   code: string;
 }
\ No newline at end of file
@@ -14,30 +14,53 @@ import {
   Partner,
   Achievement,
   DashboardStats,
+  HomeData,
   LinkPartnerData
 } from '../types';
 
-const API_URL = Constants.expoConfig?.extra?.backendUrl || process.env.EXPO_PUBLIC_BACKEND_URL;
+export const API_URL = Constants.expoConfig?.extra?.backendUrl || process.env.EXPO_PUBLIC_BACKEND_URL;
 
 const api = axios.create({
   baseURL: `${API_URL}/api`,
   timeout: 10000,
 });
 
+// Last ETag and body per GET url: refetches send If-None-Match and reuse the
+// body when the server answers 304 Not Modified
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
 // Request interceptor to add auth token
 api.interceptors.request.use(async (config) => {
   const token = await SecureStore.getItemAsync('auth_token');
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  const cached = config.method === 'get' && config.url ? etagCache.get(config.url) : undefined;
+  if (cached) {
+    config.headers['If-None-Match'] = cached.etag;
+    config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+  }
   return config;
 });
 
 // Response interceptor to handle auth errors
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const url = response.config.url;
+    if (response.config.method !== 'get' || !url) {
+      return response;
+    }
+    if (response.status === 304 && etagCache.has(url)) {
+      return { ...response, status: 200, data: etagCache.get(url)!.data };
+    }
+    if (response.headers.etag) {
+      etagCache.set(url, { etag: response.headers.etag, data: response.data });
+    }
+    return response;
+  },
   async (error) => {
     if (error.response?.status === 401) {
+      etagCache.clear();
       await SecureStore.deleteItemAsync('auth_token');
       await SecureStore.deleteItemAsync('user_data');
     }
@@ -155,4 +178,12 @@ export const dashboardAPI = {
   },
 };
 
+export const homeAPI = {
+  // One round trip for the user, partner, partner's mood and dashboard stats
+  get: async (): Promise<HomeData> => {
+    const response = await api.get('/home');
+    return response.data;
+  },
+};
+
 export default api;
\ No newline at end of file
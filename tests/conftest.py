@@ -0,0 +1,198 @@
+"""
+Fixtures for the LoveActs API query-budget tests.
+
+These tests need a real MongoDB (TEST_MONGO_URL, default
+mongodb://localhost:27017) and are skipped when none is reachable. Every
+Mongo command issued by the driver is recorded through pymongo command
+monitoring; docs/keys examined and plan summaries come from the database
+profiler, which is enabled on the throwaway test database.
+"""
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017")
+TEST_DB_NAME = f"loveacts_test_{uuid.uuid4().hex[:8]}"
+
+# Driver housekeeping that is not part of a handler's query work
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "buildInfo", "profile", "serverStatus",
+                    "explain"}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Collects succeeded and failed commands against the test database"""
+
+    def __init__(self):
+        self.commands = []
+        self._started = {}
+
+    def started(self, event):
+        if event.database_name == TEST_DB_NAME and event.command_name not in IGNORED_COMMANDS:
+            collection = event.command.get(event.command_name)
+            self._started[event.request_id] = (event.command_name, collection if isinstance(collection, str) else None)
+
+    def succeeded(self, event):
+        self._finish(event, ok=True)
+
+    def failed(self, event):
+        self._finish(event, ok=False)
+
+    def _finish(self, event, ok: bool):
+        started = self._started.pop(event.request_id, None)
+        if started:
+            name, collection = started
+            self.commands.append({
+                "command": name,
+                "collection": collection,
+                "duration_ms": event.duration_micros / 1000,
+                "ok": ok,
+            })
+
+
+# Must be registered before backend/server.py creates its Motor client
+recorder = CommandRecorder()
+monitoring.register(recorder)
+
+os.environ["MONGO_URL"] = TEST_MONGO_URL
+os.environ["DB_NAME"] = TEST_DB_NAME
+# Keep the slow-query detector's background explains out of budget captures
+os.environ["SLOW_QUERY_THRESHOLD_MS"] = "3600000"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+class Capture:
+    """What one block of requests cost: commands, profiler entries and wall time"""
+
+    def __init__(self):
+        self.commands = []
+        self.profile = []
+        self.elapsed_ms = 0.0
+
+    @property
+    def docs_examined(self) -> int:
+        return sum(entry.get("docsExamined", 0) for entry in self.profile)
+
+    @property
+    def keys_examined(self) -> int:
+        return sum(entry.get("keysExamined", 0) for entry in self.profile)
+
+    @property
+    def collscans(self) -> list:
+        return [entry for entry in self.profile if "COLLSCAN" in entry.get("planSummary", "")]
+
+    def describe(self) -> str:
+        lines = [f"{len(self.commands)} commands, {self.docs_examined} docs examined, "
+                 f"{self.keys_examined} keys examined, {self.elapsed_ms:.1f} ms"]
+        for command in self.commands:
+            lines.append(f"  {command['command']} {command['collection']} ({command['duration_ms']:.2f} ms)")
+        for entry in self.profile:
+            lines.append(f"  profile: {entry.get('op')} {entry.get('ns')} {entry.get('planSummary', '-')} "
+                         f"docs={entry.get('docsExamined', 0)} keys={entry.get('keysExamined', 0)}")
+        return "\n".join(lines)
+
+
+class QueryBudget:
+    """Runs requests through the TestClient and asserts their Mongo cost"""
+
+    def __init__(self, client, mongo_db):
+        self.client = client
+        self.mongo_db = mongo_db
+
+    @contextmanager
+    def capture(self):
+        capture = Capture()
+        since = self.mongo_db.command("serverStatus")["localTime"]
+        recorder.commands.clear()
+        started = time.perf_counter()
+        yield capture
+        capture.elapsed_ms = (time.perf_counter() - started) * 1000
+        capture.commands = list(recorder.commands)
+        capture.profile = list(self.mongo_db.system.profile.find({
+            "ts": {"$gte": since},
+            "ns": {"$ne": f"{TEST_DB_NAME}.system.profile"},
+            "command.profile": {"$exists": False},
+            "command.serverStatus": {"$exists": False},
+            "command.explain": {"$exists": False},
+        }))
+
+    @contextmanager
+    def budget(self, commands: int, docs_examined: int = None, allow_collscan: bool = False,
+               max_ms: float = None):
+        """Fail if the block issues more commands, examines more documents,
+        scans a whole collection or runs longer than allowed"""
+        with self.capture() as capture:
+            yield capture
+        problems = []
+        if len(capture.commands) > commands:
+            problems.append(f"{len(capture.commands)} Mongo commands > budget of {commands}")
+        if docs_examined is not None and capture.docs_examined > docs_examined:
+            problems.append(f"{capture.docs_examined} docs examined > budget of {docs_examined}")
+        if not allow_collscan and capture.collscans:
+            problems.append(f"COLLSCAN on {', '.join(entry['ns'] for entry in capture.collscans)}")
+        if max_ms is not None and capture.elapsed_ms > max_ms:
+            problems.append(f"{capture.elapsed_ms:.1f} ms > budget of {max_ms} ms")
+        assert not problems, "; ".join(problems) + "\n" + capture.describe()
+
+
+@pytest.fixture(scope="session")
+def mongo_db():
+    client = MongoClient(TEST_MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"MongoDB not reachable at {TEST_MONGO_URL}")
+    db = client[TEST_DB_NAME]
+    db.command("profile", 2)
+    yield db
+    db.command("profile", 0)
+    client.drop_database(TEST_DB_NAME)
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def api(mongo_db):
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as client:
+        yield QueryBudget(client, mongo_db)
+
+
+def register(client, name: str, timezone: str = "UTC") -> dict:
+    response = client.post("/api/auth/register", json={
+        "name": name, "email": f"{uuid.uuid4().hex[:12]}@example.com", "password": "BudgetTest123!",
+        "timezone": timezone
+    })
+    assert response.status_code == 200, response.text
+    data = response.json()
+    return {**data["user"], "headers": {"Authorization": f"Bearer {data['access_token']}"}}
+
+
+@pytest.fixture(scope="session")
+def couple(api):
+    """A linked couple with rated and pending history in both directions"""
+    user_a, user_b = register(api.client, "Ana"), register(api.client, "Mateo")
+    response = api.client.post("/api/couples/link-partner", json={"code": user_b["partner_code"]},
+                               headers=user_a["headers"])
+    assert response.status_code == 200, response.text
+
+    for giver, receiver in ((user_a, user_b), (user_b, user_a)):
+        for i in range(30):
+            response = api.client.post("/api/activities/create", headers=giver["headers"], json={
+                "title": f"Actividad {i}", "description": "Prueba", "category": "emocional",
+                "receiver_id": receiver["id"]
+            })
+            assert response.status_code == 200, response.text
+            if i % 3:
+                api.client.post(f"/api/activities/{response.json()['activity_id']}/rate",
+                                headers=receiver["headers"], json={"rating": 5 if i % 2 else 4})
+        api.client.post("/api/moods/create", headers=giver["headers"], json={"mood_emoji": "😊"})
+    return user_a, user_b
@@ -0,0 +1,72 @@
+"""Rule-table achievements: thresholds and one award per user"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from .conftest import register
+
+
+def due_types(**counters) -> set:
+    from server import due_achievements
+
+    return {ach.achievement_type.value for ach in due_achievements({"user_id": "u1", **counters})}
+
+
+@pytest.mark.parametrize("counter,threshold,achievement_type", [
+    ("activities_given", 10, "ten_activities"),
+    ("mood_days", 7, "daily_mood_week"),
+    ("five_star_ratings", 5, "five_five_stars"),
+])
+def test_rules_unlock_at_their_threshold(counter, threshold, achievement_type):
+    assert achievement_type not in due_types(**{counter: threshold - 1})
+    assert achievement_type in due_types(**{counter: threshold})
+    assert achievement_type in due_types(**{counter: threshold + 5})
+
+
+def test_unlocked_rules_are_not_due_again():
+    assert due_types(activities_given=12, unlocked=["first_activity", "ten_activities"]) == set()
+
+
+def achievement_types(api, user_id: str) -> list:
+    return sorted(doc["achievement_type"] for doc in api.mongo_db.achievements.find({"user_id": user_id}))
+
+
+def test_ten_activities_is_awarded_once(api):
+    giver, receiver = register(api.client, "Andrea"), register(api.client, "Pablo")
+    response = api.client.post("/api/couples/link-partner", json={"code": receiver["partner_code"]},
+                               headers=giver["headers"])
+    assert response.status_code == 200, response.text
+
+    def give(count: int):
+        for i in range(count):
+            response = api.client.post("/api/activities/create", headers=giver["headers"], json={
+                "title": f"Logro {i}", "description": "Prueba", "category": "general", "receiver_id": receiver["id"]
+            })
+            assert response.status_code == 200, response.text
+
+    give(9)
+    assert "ten_activities" not in achievement_types(api, giver["id"])
+    give(1)
+    assert achievement_types(api, giver["id"]).count("ten_activities") == 1
+    give(3)
+    assert achievement_types(api, giver["id"]).count("ten_activities") == 1
+    assert achievement_types(api, giver["id"]).count("first_activity") == 1
+
+
+def test_daily_mood_week_is_awarded_once(api):
+    user = register(api.client, "Lucas")
+    now = datetime.utcnow()
+
+    def log_moods(days):
+        response = api.client.post("/api/sync/push", headers=user["headers"], json={"moods": [
+            {"client_key": f"day-{i}", "mood_emoji": "😊", "recorded_at": (now - timedelta(days=i)).isoformat()}
+            for i in days
+        ]})
+        assert response.status_code == 200, response.text
+
+    log_moods(range(6))
+    assert "daily_mood_week" not in achievement_types(api, user["id"])
+    log_moods(range(6, 7))
+    assert achievement_types(api, user["id"]).count("daily_mood_week") == 1
+    log_moods(range(7, 10))
+    assert achievement_types(api, user["id"]).count("daily_mood_week") == 1
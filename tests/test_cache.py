@@ -0,0 +1,24 @@
+"""Response cache backends: variants per key stay bounded"""
+import asyncio
+
+from cache import LocalResponseBackend, MemoryStore, SharedResponseBackend
+
+
+def test_local_backend_drops_the_oldest_variant_over_the_cap():
+    async def run():
+        backend = LocalResponseBackend(maxsize=10, ttl=60, max_variants=2)
+        for variant in ("a", "b", "c"):
+            await backend.set("response:moods:u1", variant, variant.encode())
+        return [await backend.get("response:moods:u1", variant) for variant in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [None, b"b", b"c"]
+
+
+def test_shared_backend_stores_no_variant_over_the_cap():
+    async def run():
+        backend = SharedResponseBackend(MemoryStore(), ttl=60, max_variants=2)
+        for variant in ("a", "b", "c"):
+            await backend.set("response:moods:u1", variant, variant.encode())
+        return [await backend.get("response:moods:u1", variant) for variant in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [b"a", b"b", None]
@@ -0,0 +1,35 @@
+"""Index catalogue: a unique index over duplicate data is reported, not fatal"""
+import asyncio
+import uuid
+
+from pymongo import ASCENDING, IndexModel
+
+from .conftest import TEST_DB_NAME, TEST_MONGO_URL
+
+
+def test_failed_unique_index_is_reported(mongo_db):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    from indexes import ensure_indexes
+
+    name = f"index_probe_{uuid.uuid4().hex[:8]}"
+    # Two moods on one day, as stored before the mood_day_keys migration
+    mongo_db[name].insert_many([{"user_id": "u1", "day": "2026-01-01"} for _ in range(2)])
+    catalogue = {name: [
+        IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], unique=True),
+        IndexModel([("day", ASCENDING)]),
+    ]}
+
+    async def run():
+        client = AsyncIOMotorClient(TEST_MONGO_URL)
+        try:
+            return await ensure_indexes(client[TEST_DB_NAME], catalogue)
+        finally:
+            client.close()
+
+    try:
+        report = asyncio.run(run())[name]
+    finally:
+        mongo_db.drop_collection(name)
+    assert report["created"] == ["day_1"]
+    assert [entry["index"] for entry in report["failed"]] == ["user_id_1_day_1"]
@@ -0,0 +1,53 @@
+"""Partner linking: a user already linked is never relinked, even from a stale principal"""
+import pytest
+
+from .conftest import register
+
+
+def snapshot(api, user_id: str) -> dict:
+    return {
+        "user": api.mongo_db.users.find_one({"id": user_id}, {"_id": 0}),
+        "counters": api.mongo_db.user_counters.find_one({"user_id": user_id}, {"_id": 0}),
+        "achievements": api.mongo_db.achievements.count_documents({"user_id": user_id}),
+    }
+
+
+def link(api, user: dict, partner: dict):
+    return api.client.post("/api/couples/link-partner", json={"code": partner["partner_code"]},
+                           headers=user["headers"])
+
+
+@pytest.mark.parametrize("member", ["first", "second"])
+def test_linked_user_cannot_link_again(api, member):
+    import server
+
+    user_a, user_b, user_c = register(api.client, "Ana"), register(api.client, "Bruno"), register(api.client, "Clara")
+    linked = user_a if member == "first" else user_b
+    # Cache the principal of the member that will retry while it has no partner yet
+    api.client.get("/api/auth/me", headers=linked["headers"])
+    stale = server.principal_cache.get(linked["id"])
+    assert stale is not None and stale.partner_id is None
+
+    response = link(api, user_a, user_b)
+    assert response.status_code == 200, response.text
+    before = {user["id"]: snapshot(api, user["id"]) for user in (user_a, user_b, user_c)}
+
+    # With a fresh principal the request is refused up front
+    response = link(api, linked, user_c)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Already have a partner"
+
+    # Another worker may still hold the unlinked principal: the guarded writes refuse it
+    server.principal_cache.set(linked["id"], stale)
+    response = link(api, linked, user_c)
+    assert response.status_code == 409, response.text
+
+    assert {user["id"]: snapshot(api, user["id"]) for user in (user_a, user_b, user_c)} == before
+    assert api.mongo_db.couples.count_documents({"code": user_c["partner_code"]}) == 0
+
+    # And C cannot claim either member of the couple
+    for member_code in (user_a, user_b):
+        response = link(api, user_c, member_code)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Partner already linked to someone else"
+    assert {user["id"]: snapshot(api, user["id"]) for user in (user_a, user_b, user_c)} == before
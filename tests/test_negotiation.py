@@ -0,0 +1,101 @@
+"""Response format and compression negotiation"""
+import gzip
+
+import pytest
+
+from negotiation import JSON, MSGPACK, accepted, negotiate_encoding, negotiate_format, NegotiationMiddleware
+
+msgpack = pytest.importorskip("msgpack")
+
+MINIMUM_SIZE = 256
+
+
+@pytest.fixture(scope="module")
+def client():
+    """A bare app rendering like the API, behind the negotiation middleware"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from server import NegotiatedResponse
+
+    app = FastAPI(default_response_class=NegotiatedResponse)
+    app.add_middleware(NegotiationMiddleware, minimum_size=MINIMUM_SIZE)
+
+    @app.get("/items")
+    async def items(count: int):
+        return {"items": [{"id": i, "title": "Actividad"} for i in range(count)]}
+
+    return TestClient(app)
+
+
+def test_accepted_parses_q_values():
+    assert accepted("application/json;q=0.5, application/msgpack, text/*;q=0") == {
+        "application/json": 0.5, "application/msgpack": 1.0
+    }
+    assert accepted("gzip;q=abc, br") == {"br": 1.0}
+
+
+@pytest.mark.parametrize("accept,expected", [
+    ("", JSON),
+    ("application/json", JSON),
+    ("application/msgpack", MSGPACK),
+    ("application/x-msgpack, application/json", MSGPACK),
+    ("application/json, application/msgpack;q=0.5", JSON),
+    ("*/*, application/msgpack;q=0.9", JSON),
+    ("application/msgpack;q=0", JSON),
+])
+def test_negotiate_format(accept, expected):
+    assert negotiate_format(accept) == expected
+
+
+@pytest.mark.parametrize("accept_encoding,expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, br", "br"),
+    ("br;q=0.1, gzip", "gzip"),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    pytest.importorskip("brotli")
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_msgpack_body_and_content_type(client):
+    response = client.get("/items", params={"count": 2},
+                          headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"})
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(response.content) == {"items": [{"id": 0, "title": "Actividad"},
+                                                           {"id": 1, "title": "Actividad"}]}
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_large_bodies_are_compressed(client, encoding):
+    decompress = gzip.decompress if encoding == "gzip" else pytest.importorskip("brotli").decompress
+    with client.stream("GET", "/items", params={"count": 50}, headers={"Accept-Encoding": encoding}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["content-length"] == str(len(raw))
+    assert decompress(raw).startswith(b'{"items":')
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+
+
+def test_small_bodies_are_sent_as_is(client):
+    response = client.get("/items", params={"count": 1}, headers={"Accept-Encoding": "gzip"})
+    assert len(response.content) < MINIMUM_SIZE
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+
+
+def test_each_format_has_its_own_etag(api, couple):
+    user_a, _ = couple
+    as_json = api.client.get("/api/dashboard/stats", headers=user_a["headers"])
+    as_msgpack = api.client.get("/api/dashboard/stats", headers={**user_a["headers"], "Accept": MSGPACK})
+    assert as_msgpack.headers["content-type"] == MSGPACK
+    assert as_json.headers["etag"] != as_msgpack.headers["etag"]
+
+    # A JSON ETag does not validate a MessagePack request
+    response = api.client.get("/api/dashboard/stats", headers={
+        **user_a["headers"], "Accept": MSGPACK, "If-None-Match": as_json.headers["etag"]
+    })
+    assert response.status_code == 200
+    assert msgpack.unpackb(response.content)["current_streak"] == as_json.json()["current_streak"]
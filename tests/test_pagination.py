@@ -0,0 +1,66 @@
+"""Keyset pagination of the feeds: cursors, ties and NDJSON streaming"""
+import json
+from datetime import datetime
+
+import pytest
+
+from .conftest import register
+
+ACTIVITIES = 7
+
+
+@pytest.fixture(scope="module")
+def giver(api):
+    """A user with ACTIVITIES given activities that all share one created_at"""
+    user, partner = register(api.client, "Elena"), register(api.client, "Tomás")
+    response = api.client.post("/api/couples/link-partner", json={"code": partner["partner_code"]},
+                               headers=user["headers"])
+    assert response.status_code == 200, response.text
+    for i in range(ACTIVITIES):
+        response = api.client.post("/api/activities/create", headers=user["headers"], json={
+            "title": f"Empate {i}", "description": "Prueba", "category": "general", "receiver_id": partner["id"]
+        })
+        assert response.status_code == 200, response.text
+    api.mongo_db.activities.update_many({"giver_id": user["id"]}, {"$set": {"created_at": datetime(2026, 1, 1)}})
+    return user
+
+
+def test_pages_walk_ties_without_duplicates_or_gaps(api, giver):
+    ids, cursor = [], None
+    for _ in range(ACTIVITIES):
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = api.client.get("/api/activities/my-activities", params=params, headers=giver["headers"])
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= 3
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    expected = api.mongo_db.activities.distinct("id", {"giver_id": giver["id"]})
+    assert len(ids) == len(set(ids)) == ACTIVITIES
+    assert set(ids) == set(expected)
+    assert ids == sorted(ids, reverse=True)  # ties fall back to id order
+
+
+def test_malformed_cursor_is_rejected(api, giver):
+    response = api.client.get("/api/activities/my-activities", params={"cursor": "not-a-cursor"},
+                              headers=giver["headers"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_stream_ends_with_the_next_cursor(api, giver):
+    response = api.client.get("/api/activities/my-activities", params={"limit": 3, "stream": "true"},
+                              headers=giver["headers"])
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 4
+    assert all("id" in line for line in lines[:3])
+    assert set(lines[-1]) == {"next_cursor"}
+
+    response = api.client.get("/api/activities/my-activities", params={"limit": 3, "cursor": lines[-1]["next_cursor"]},
+                              headers=giver["headers"])
+    assert response.status_code == 200, response.text
+    assert not {item["id"] for item in response.json()["items"]} & {line["id"] for line in lines[:3]}
@@ -0,0 +1,22 @@
+"""Partner mood lookups use the partner's calendar day, not the viewer's"""
+from .conftest import register
+
+
+def test_partner_mood_uses_partner_timezone(api):
+    # 25 hours apart: the two local days always differ
+    viewer = register(api.client, "Lucía", timezone="Pacific/Kiritimati")
+    partner = register(api.client, "Diego", timezone="Pacific/Pago_Pago")
+    response = api.client.post("/api/couples/link-partner", json={"code": partner["partner_code"]},
+                               headers=viewer["headers"])
+    assert response.status_code == 200, response.text
+    response = api.client.post("/api/moods/create", headers=partner["headers"], json={"mood_emoji": "😊"})
+    assert response.status_code == 200, response.text
+
+    response = api.client.get("/api/moods/partner-mood", headers=viewer["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["mood_emoji"] == "😊"
+
+    response = api.client.get("/api/home", headers=viewer["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["partner_mood"]["mood_emoji"] == "😊"
+    assert response.json()["partner"]["timezone"] == "Pacific/Pago_Pago"
@@ -0,0 +1,106 @@
+"""Per-endpoint Mongo query budgets: command count, docs examined, no COLLSCAN"""
+import pytest
+
+# (method, path, max commands, max docs examined) in the steady state, with the
+# authenticated principal already cached. Routes with an ETag add one data
+# version read of up to two counters documents.
+READ_BUDGETS = [
+    ("GET", "/api/auth/me", 0, 0),
+    ("GET", "/api/dashboard/stats", 2, 64),
+    ("GET", "/api/couples/my-partner", 0, 0),
+    ("GET", "/api/moods/partner-mood", 2, 3),
+    ("GET", "/api/moods/my-moods?limit=20", 2, 23),
+    ("GET", "/api/activities/my-activities?limit=20", 2, 23),
+    ("GET", "/api/activities/partner-activities?limit=20", 2, 23),
+    ("GET", "/api/activities/partner-activities?limit=20&fields=title,rating", 2, 23),
+    ("GET", "/api/activities/pending-ratings?limit=20", 2, 23),
+    ("GET", "/api/activities/pending-count", 1, 1),
+    ("GET", "/api/activities/special-memories", 1, 40),
+    ("GET", "/api/achievements/my-achievements", 2, 12),
+    ("GET", "/api/achievements/check-new", 1, 1),
+    ("GET", "/api/home", 4, 66),
+]
+
+
+@pytest.mark.parametrize("method,path,commands,docs_examined", READ_BUDGETS,
+                         ids=[f"{method} {path}" for method, path, _, _ in READ_BUDGETS])
+def test_read_endpoint_budget(api, couple, method, path, commands, docs_examined):
+    user_a, _ = couple
+    api.client.request(method, path, headers=user_a["headers"])  # warm the principal cache
+    with api.budget(commands=commands, docs_examined=docs_examined):
+        response = api.client.request(method, path, headers=user_a["headers"])
+    assert response.status_code == 200, response.text
+
+
+def test_create_activity_budget(api, couple):
+    user_a, user_b = couple
+    # Insert, the giver's counters find_one_and_update and the receiver's pending
+    # badge update; no achievement is due
+    with api.budget(commands=3):
+        response = api.client.post("/api/activities/create", headers=user_a["headers"], json={
+            "title": "Presupuesto", "description": "Prueba", "category": "general", "receiver_id": user_b["id"]
+        })
+    assert response.status_code == 200, response.text
+
+
+def test_create_mood_budget(api, couple):
+    user_a, _ = couple
+    # Same-day resubmission is a single upsert, the partner's snapshot update
+    # and the data version bump
+    with api.budget(commands=3, docs_examined=3):
+        response = api.client.post("/api/moods/create", headers=user_a["headers"], json={"mood_emoji": "🥰"})
+    assert response.status_code == 200, response.text
+    assert response.json()["message"] == "Mood updated successfully"
+
+
+def test_rate_activity_budget(api, couple):
+    user_a, user_b = couple
+    created = api.client.post("/api/activities/create", headers=user_b["headers"], json={
+        "title": "Para calificar", "description": "Prueba", "category": "práctico", "receiver_id": user_a["id"]
+    }).json()
+    # Lookup, guarded update and the pending badge; a 4-star rating unlocks nothing
+    with api.budget(commands=3, docs_examined=3):
+        response = api.client.post(f"/api/activities/{created['activity_id']}/rate",
+                                   headers=user_a["headers"], json={"rating": 4})
+    assert response.status_code == 200, response.text
+
+
+def test_cached_read_is_invalidated_by_write(api, couple):
+    user_a, _ = couple
+    latest = api.client.get("/api/moods/my-moods", headers=user_a["headers"]).json()[0]["mood_emoji"]
+    # Served from the response cache after the ETag's data version read
+    with api.budget(commands=1, docs_examined=2):
+        response = api.client.get("/api/moods/my-moods", headers=user_a["headers"])
+    assert response.json()[0]["mood_emoji"] == latest
+
+    emoji = "😢" if latest != "😢" else "😔"
+    api.client.post("/api/moods/create", headers=user_a["headers"], json={"mood_emoji": emoji})
+    response = api.client.get("/api/moods/my-moods", headers=user_a["headers"])
+    assert response.json()[0]["mood_emoji"] == emoji
+
+
+def test_conditional_get_answers_304_from_the_data_version(api, couple):
+    user_a, user_b = couple
+    etag = api.client.get("/api/activities/my-activities", headers=user_a["headers"]).headers["etag"]
+    # One data version read, no activities query
+    with api.budget(commands=1, docs_examined=2):
+        response = api.client.get("/api/activities/my-activities",
+                                  headers={**user_a["headers"], "If-None-Match": etag})
+    assert response.status_code == 304
+
+    # The partner rating one of them changes the version
+    pending = api.client.get("/api/activities/pending-ratings", headers=user_b["headers"]).json()
+    api.client.post(f"/api/activities/{pending[0]['id']}/rate", headers=user_b["headers"], json={"rating": 3})
+    response = api.client.get("/api/activities/my-activities", headers={**user_a["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_fieldset_spellings_share_a_cached_body(api, couple):
+    user_a, _ = couple
+    api.client.get("/api/moods/my-moods?limit=5&fields=mood_emoji,note", headers=user_a["headers"])
+    # Same fields in another order and spacing: served from the same cache entry
+    with api.budget(commands=1, docs_examined=2):
+        response = api.client.get("/api/moods/my-moods", params={"limit": 5, "fields": "note, mood_emoji,note"},
+                                  headers=user_a["headers"])
+    assert response.status_code == 200, response.text
@@ -0,0 +1,12 @@
+"""Real-time couple events over the WebSocket hub"""
+
+
+def test_partner_receives_mood_event(api, couple):
+    user_a, user_b = couple
+    with api.client.websocket_connect("/api/events/ws", headers=user_b["headers"]) as socket:
+        response = api.client.post("/api/moods/create", headers=user_a["headers"], json={"mood_emoji": "🥰"})
+        assert response.status_code == 200, response.text
+        event = socket.receive_json()
+    assert event["type"] == "mood"
+    assert event["user_id"] == user_a["id"]
+    assert event["mood"]["mood_emoji"] == "🥰"
@@ -0,0 +1,80 @@
+"""Activity streaks: the counters pipeline, the dashboard lapse and the backfill"""
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from .conftest import register
+
+
+@pytest.fixture
+def streak(mongo_db):
+    """Applies streak_stages for one day to a throwaway counters document and returns it"""
+    from server import streak_stages
+
+    user_id = f"streak-{uuid.uuid4().hex}"
+
+    def record(day: str) -> dict:
+        mongo_db.user_counters.update_one({"user_id": user_id}, streak_stages(day), upsert=True)
+        return mongo_db.user_counters.find_one({"user_id": user_id}, {"_id": 0})
+
+    return record
+
+
+def test_consecutive_day_extends_the_streak(streak):
+    assert streak("2026-01-10")["current_streak"] == 1
+    counters = streak("2026-01-11")
+    assert (counters["current_streak"], counters["longest_streak"], counters["last_active_day"]) == \
+        (2, 2, "2026-01-11")
+
+
+def test_second_activity_on_the_same_day_changes_nothing(streak):
+    streak("2026-01-10")
+    before = streak("2026-01-11")
+    assert streak("2026-01-11") == before
+
+
+def test_gap_restarts_the_streak(streak):
+    streak("2026-01-10")
+    streak("2026-01-11")
+    counters = streak("2026-01-13")
+    assert (counters["current_streak"], counters["longest_streak"], counters["last_active_day"]) == \
+        (1, 2, "2026-01-13")
+
+
+def test_late_write_for_an_older_day_is_ignored(streak):
+    streak("2026-01-10")
+    before = streak("2026-01-11")
+    assert streak("2026-01-09") == before
+    assert streak("2026-01-10") == before
+
+
+def test_dashboard_reports_no_streak_after_a_missed_day(api, mongo_db):
+    user = register(api.client, "Camila")
+    today = datetime.utcnow().date()  # the test user is on UTC
+
+    def dashboard_streak(last_active_day: date) -> int:
+        # Bumping the data version keeps the cached dashboard from hiding the change
+        mongo_db.user_counters.update_one(
+            {"user_id": user["id"]},
+            {"$set": {"current_streak": 4, "last_active_day": last_active_day.isoformat()},
+             "$inc": {"data_version": 1}},
+            upsert=True
+        )
+        response = api.client.get("/api/dashboard/stats", headers=user["headers"])
+        assert response.status_code == 200, response.text
+        return response.json()["current_streak"]
+
+    assert dashboard_streak(today) == 4
+    assert dashboard_streak(today - timedelta(days=1)) == 4
+    assert dashboard_streak(today - timedelta(days=2)) == 0
+
+
+def test_backfill_streak_fields():
+    from migrations import streak_fields
+
+    assert streak_fields([]) == {"last_active_day": None, "current_streak": 0, "longest_streak": 0}
+    assert streak_fields(["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-05", "2026-01-06"]) == {
+        "last_active_day": "2026-01-06", "current_streak": 2, "longest_streak": 3
+    }
+    assert streak_fields(["2025-12-31", "2026-01-01"])["current_streak"] == 2
@@ -0,0 +1,150 @@
+"""Offline sync: idempotent batch replays, last-writer-wins moods and token-based pulls"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from .conftest import register
+
+
+def counters(api, user_id: str) -> dict:
+    return api.mongo_db.user_counters.find_one({"user_id": user_id}, {"_id": 0}) or {}
+
+
+def push(api, user: dict, **batch) -> dict:
+    response = api.client.post("/api/sync/push", headers=user["headers"], json=batch)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_replayed_batch_reports_duplicates_without_counting_twice(api, couple):
+    user_a, user_b = couple
+    batch = {"activities": [
+        {"client_key": uuid.uuid4().hex, "title": "Sin conexión", "description": "Prueba", "category": "general"}
+    ]}
+    before_a, before_b = counters(api, user_a["id"]), counters(api, user_b["id"])
+
+    first = push(api, user_a, **batch)
+    assert [item["status"] for item in first["activities"]] == ["created"]
+    after_a, after_b = counters(api, user_a["id"]), counters(api, user_b["id"])
+    assert after_a["activities_given"] == before_a["activities_given"] + 1
+    assert after_b["pending_count"] == before_b["pending_count"] + 1
+
+    replay = push(api, user_a, **batch)
+    assert [item["status"] for item in replay["activities"]] == ["duplicate"]
+    assert counters(api, user_a["id"])["activities_given"] == after_a["activities_given"]
+    assert counters(api, user_b["id"])["pending_count"] == after_b["pending_count"]
+    assert api.mongo_db.activities.count_documents({"client_key": batch["activities"][0]["client_key"]}) == 1
+
+
+def test_older_same_day_mood_is_stale(api):
+    user = register(api.client, "Sofía")
+    start_of_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    earlier, later = start_of_day, start_of_day + timedelta(seconds=1)
+
+    result = push(api, user, moods=[{"client_key": "later", "mood_emoji": "🥰", "recorded_at": later.isoformat()}])
+    assert [item["status"] for item in result["moods"]] == ["created"]
+    result = push(api, user, moods=[{"client_key": "earlier", "mood_emoji": "😢", "recorded_at": earlier.isoformat()}])
+    assert [item["status"] for item in result["moods"]] == ["stale"]
+
+    moods = api.client.get("/api/moods/my-moods", headers=user["headers"]).json()
+    assert [mood["mood_emoji"] for mood in moods] == ["🥰"]
+    assert counters(api, user["id"])["mood_days"] == 1
+
+
+def test_second_rating_of_an_activity_in_one_batch_is_a_duplicate(api, couple):
+    user_a, user_b = couple
+    response = api.client.post("/api/activities/create", headers=user_b["headers"], json={
+        "title": "Doble calificación", "description": "Prueba", "category": "físico", "receiver_id": user_a["id"]
+    })
+    assert response.status_code == 200, response.text
+    activity_id = response.json()["activity_id"]
+    before_a, before_b = counters(api, user_a["id"]), counters(api, user_b["id"])
+
+    result = push(api, user_a, ratings=[
+        {"client_key": "first", "activity_id": activity_id, "rating": 5},
+        {"client_key": "second", "activity_id": activity_id, "rating": 2},
+    ])
+    assert [item["status"] for item in result["ratings"]] == ["rated", "duplicate"]
+    assert api.mongo_db.activities.find_one({"id": activity_id})["rating"] == 5
+    assert counters(api, user_a["id"])["pending_count"] == before_a["pending_count"] - 1
+    assert counters(api, user_b["id"])["five_star_ratings"] == before_b.get("five_star_ratings", 0) + 1
+
+
+def spread_updated_at(api, collection: str, query: dict, start: datetime, step: timedelta = timedelta(seconds=1)):
+    """Stamp the matching documents with updated_at from `start`, `step` apart"""
+    for i, doc in enumerate(api.mongo_db[collection].find(query, {"_id": 1}).sort("_id", 1)):
+        api.mongo_db[collection].update_one({"_id": doc["_id"]}, {"$set": {"updated_at": start + step * i}})
+
+
+def pull(api, user: dict, since: str = None) -> dict:
+    response = api.client.get("/api/sync", headers=user["headers"], params={"since": since} if since else None)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_pull_since_token_returns_only_changed_documents(api):
+    user = register(api.client, "Valentina")
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    push(api, user, moods=[{"client_key": "old", "mood_emoji": "😐", "recorded_at": yesterday.isoformat()}])
+    # Outside the token's overlap window
+    an_hour_ago = datetime.utcnow() - timedelta(hours=1)
+    for collection in ("moods", "achievements"):
+        spread_updated_at(api, collection, {"user_id": user["id"]}, an_hour_ago)
+
+    snapshot = pull(api, user)
+    assert [mood["mood_emoji"] for mood in snapshot["moods"]] == ["😐"]
+    assert snapshot["has_more"] is False
+
+    push(api, user, moods=[{"client_key": "new", "mood_emoji": "🥰"}])
+    changes = pull(api, user, snapshot["next_token"])
+    assert [mood["mood_emoji"] for mood in changes["moods"]] == ["🥰"]
+    assert changes["activities"] == []
+
+
+@pytest.mark.parametrize("step", [timedelta(seconds=1), timedelta(0)], ids=["distinct", "tied"])
+def test_pull_resumes_after_truncation(api, monkeypatch, step):
+    import server
+
+    user = register(api.client, "Martín")
+    now = datetime.utcnow()
+    push(api, user, moods=[
+        {"client_key": f"day-{i}", "mood_emoji": "😊", "recorded_at": (now - timedelta(days=i)).isoformat()}
+        for i in range(5)
+    ])
+    for collection in ("moods", "achievements"):
+        spread_updated_at(api, collection, {"user_id": user["id"]}, now - timedelta(minutes=10), step)
+    mood_ids = {mood["id"] for mood in api.mongo_db.moods.find({"user_id": user["id"]}, {"id": 1})}
+    monkeypatch.setattr(server, "SYNC_MAX_DOCS", 2)
+
+    seen, token = set(), None
+    for _ in range(10):
+        page = pull(api, user, token)
+        assert len(page["moods"]) <= 2
+        seen.update(mood["id"] for mood in page["moods"])
+        token = page["next_token"]
+        if not page["has_more"]:
+            break
+    else:
+        raise AssertionError("has_more never cleared")
+    assert seen == mood_ids
+
+
+def test_pull_rejects_an_invalid_token(api, couple):
+    user_a, _ = couple
+    response = api.client.get("/api/sync", headers=user_a["headers"], params={"since": "not-a-token"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid sync token"
+
+
+@pytest.mark.parametrize("raw", [
+    json.dumps(["2020-01-01T00:00:00+00:00", ""]),
+    "2020-01-01T02:00:00+02:00",  # bare timestamp, as issued before (updated_at, id) tokens
+])
+def test_pull_accepts_a_token_with_a_utc_offset(api, couple, raw):
+    user_a, _ = couple
+    token = base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+    page = pull(api, user_a, token)
+    assert page["moods"]